@@ -0,0 +1,224 @@
+"""Precomputed aggregate cube for the Visualizations charts.
+
+Every chart in page.py is a count, mean, median or distribution over one or
+two columns. All the numeric columns are small integers, so a single count
+table per column pair holds everything those charts need. The cube builds
+all of these tables with one ``np.bincount`` pass per pair. After that,
+crosstabs, means, medians and box-plot statistics are read from the small
+tables, not from the raw rows. Counts are additive, so the cube of appended
+rows can be merged into an existing cube without recounting it.
+
+``joint_counts`` does the same for the clustering view. It produces
+per-cluster binned counts over the numeric columns, so that view no longer
+plots every row.
+"""
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from data_loader import CATEGORICAL_COLUMNS, NUMERIC_COLUMNS
+from instrumentation import span
+
+CUBE_COLUMNS = CATEGORICAL_COLUMNS + NUMERIC_COLUMNS
+
+
+def _codes(series):
+    """Return integer codes and their labels for a column (observed values only)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        labels = series.cat.categories
+    else:
+        codes, labels = pd.factorize(series, sort=True)
+    return codes, pd.Index(np.asarray(labels), name=series.name)
+
+
+def _trim(table):
+    """Drop rows and columns that have no observations."""
+    return table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+
+
+def weighted_quantile(values, counts, q):
+    """``np.percentile``-style linear quantile of ``values`` repeated ``counts`` times."""
+    values = np.asarray(values, dtype=float)
+    cum = np.cumsum(counts)
+    n = cum[-1]
+    if n == 0:
+        return np.nan
+    pos = q * (n - 1)
+    lo = int(np.floor(pos))
+    hi = min(lo + 1, n - 1)
+    v_lo = values[np.searchsorted(cum, lo, side='right')]
+    v_hi = values[np.searchsorted(cum, hi, side='right')]
+    return v_lo + (v_hi - v_lo) * (pos - lo)
+
+
+def box_stats(values, counts, label='', whis=1.5):
+    """Matplotlib ``bxp`` statistics computed from a value/count distribution."""
+    values = np.asarray(values, dtype=float)
+    counts = np.asarray(counts)
+    q1, med, q3 = (weighted_quantile(values, counts, q) for q in (0.25, 0.5, 0.75))
+    iqr = q3 - q1
+    present = values[counts > 0]
+    inside = present[(present >= q1 - whis * iqr) & (present <= q3 + whis * iqr)]
+    total = counts.sum()
+    return {
+        'label': label,
+        'mean': float((values * counts).sum() / total),
+        'med': med,
+        'q1': q1,
+        'q3': q3,
+        'whislo': inside.min(),
+        'whishi': inside.max(),
+        'fliers': present[(present < inside.min()) | (present > inside.max())],
+    }
+
+
+class AggregateCube:
+    """Single-column and pairwise count tables over the dataset's columns.
+
+    Derived tables (means, medians, box statistics) are memoized, so each one
+    is computed once per cube, i.e. once per dataset version.
+    """
+
+    def __init__(self, totals, pairs, n_rows):
+        self.totals = totals
+        self.pairs = pairs
+        self.n_rows = n_rows
+        self._memo = {}
+
+    @classmethod
+    def from_frame(cls, df, columns=CUBE_COLUMNS, weights=None):
+        """Cube over the rows of ``df``.
+
+        ``weights`` is the number of cases each row stands for, e.g. the
+        counts of an already grouped table.
+        """
+        encoded = {col: _codes(df[col]) for col in columns}
+        weights = None if weights is None else np.asarray(weights, dtype=np.int64)
+
+        def bincount(codes, valid, minlength):
+            counts = np.bincount(codes, None if weights is None else weights[valid], minlength)
+            return counts.astype(np.int64, copy=False)
+
+        totals = {}
+        for col, (codes, labels) in encoded.items():
+            valid = codes >= 0
+            totals[col] = pd.Series(bincount(codes[valid], valid, len(labels)), index=labels, name='count')
+        pairs = {}
+        for a, b in combinations(columns, 2):
+            (codes_a, labels_a), (codes_b, labels_b) = encoded[a], encoded[b]
+            valid = (codes_a >= 0) & (codes_b >= 0)
+            flat = codes_a[valid].astype(np.int64) * len(labels_b) + codes_b[valid]
+            counts = bincount(flat, valid, len(labels_a) * len(labels_b))
+            table = pd.DataFrame(
+                counts.reshape(len(labels_a), len(labels_b)), index=labels_a, columns=labels_b
+            )
+            pairs[(a, b)] = table
+        return cls(totals, pairs, len(df) if weights is None else int(weights.sum()))
+
+    def merge(self, other):
+        """Cube over the rows of both cubes; counts add, so cubes form a monoid.
+
+        Derived tables are not carried over; they are recomputed on demand
+        from the merged counts.
+        """
+        def add(left, right):
+            total = left.add(right, fill_value=0).fillna(0).astype(np.int64)
+            return total.sort_index() if total.ndim == 1 else total.sort_index().sort_index(axis=1)
+        totals = {col: add(self.totals[col], other.totals[col]) for col in self.totals}
+        pairs = {key: add(self.pairs[key], other.pairs[key]) for key in self.pairs}
+        return AggregateCube(totals, pairs, self.n_rows + other.n_rows)
+
+    __add__ = merge
+
+    def _cached(self, key, compute):
+        with span('aggregate', ' '.join(str(part) for part in key if part is not None)) as current:
+            current.cache = 'hit' if key in self._memo else 'miss'
+            if key not in self._memo:
+                self._memo[key] = compute()
+            return self._memo[key]
+
+    def counts(self, col):
+        """Number of cases per value of ``col``, in sorted value order."""
+        totals = self.totals[col]
+        return totals[totals > 0]
+
+    def crosstab(self, index, columns):
+        """Equivalent of ``pd.crosstab(df[index], df[columns])``."""
+        def compute():
+            if (index, columns) in self.pairs:
+                table = self.pairs[(index, columns)]
+            else:
+                table = self.pairs[(columns, index)].T
+            return _trim(table)
+        return self._cached(('crosstab', index, columns), compute)
+
+    def mean(self, by, value):
+        """Equivalent of ``df.groupby(by)[value].mean()``."""
+        def compute():
+            table = self.crosstab(by, value)
+            weights = table.columns.to_numpy(dtype=float)
+            return (table * weights).sum(axis=1) / table.sum(axis=1)
+        return self._cached(('mean', by, value), compute).rename(value)
+
+    def sem(self, by, value):
+        """Standard error of the mean of ``value`` within each ``by`` group."""
+        def compute():
+            table = self.crosstab(by, value)
+            weights = table.columns.to_numpy(dtype=float)
+            n = table.sum(axis=1)
+            mean = (table * weights).sum(axis=1) / n
+            var = (table * weights ** 2).sum(axis=1) / n - mean ** 2
+            return np.sqrt(var * n / (n - 1).clip(lower=1)) / np.sqrt(n)
+        return self._cached(('sem', by, value), compute).rename(value)
+
+    def median(self, by, value):
+        """Equivalent of ``df.groupby(by)[value].median()``."""
+        def compute():
+            table = self.crosstab(by, value)
+            return pd.Series(
+                [weighted_quantile(table.columns, row, 0.5) for row in table.to_numpy()],
+                index=table.index,
+            )
+        return self._cached(('median', by, value), compute).rename(value)
+
+    def box_stats(self, value, by=None):
+        """Box-plot statistics for ``value``, overall or per ``by`` group."""
+        def compute():
+            if by is None:
+                counts = self.counts(value)
+                return [box_stats(counts.index, counts.to_numpy())]
+            table = self.crosstab(by, value)
+            return [box_stats(table.columns, row, label) for label, row in zip(table.index, table.to_numpy())]
+        return self._cached(('box', value, by), compute)
+
+
+def _binned_codes(series, max_bins):
+    """Integer bin codes and bin centres for a numeric column.
+
+    Columns with at most ``max_bins`` distinct values keep one bin per value;
+    wider columns are cut into ``max_bins`` equal-width bins.
+    """
+    values = series.to_numpy()
+    codes, uniques = pd.factorize(values, sort=True)
+    if len(uniques) <= max_bins:
+        return codes, np.asarray(uniques, dtype=float)
+    edges = np.histogram_bin_edges(values, bins=max_bins)
+    codes = np.clip(np.digitize(values, edges[1:-1]), 0, max_bins - 1)
+    return codes, (edges[:-1] + edges[1:]) / 2
+
+
+def joint_counts(df, group, columns, max_bins=30):
+    """Count array of shape (groups, *bins) over ``group`` and binned numeric ``columns``.
+
+    Built with one ``np.bincount`` pass; its size depends only on the number of
+    groups and bins, never on the number of rows. Returns the counts, the
+    group labels and the bin centres of each column.
+    """
+    group_codes, group_labels = pd.factorize(df[group], sort=True)
+    binned = [_binned_codes(df[col], max_bins) for col in columns]
+    shape = (len(group_labels), *(len(centres) for _, centres in binned))
+    flat = np.ravel_multi_index((group_codes, *(codes for codes, _ in binned)), shape)
+    counts = np.bincount(flat, minlength=int(np.prod(shape))).reshape(shape)
+    return counts, np.asarray(group_labels), [centres for _, centres in binned]
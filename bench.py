@@ -0,0 +1,409 @@
+"""Headless benchmark of the dashboard on synthetic datasets.
+
+    python bench.py --scales 1 10 100 --output bench.json
+
+Each scale resamples the rows of ``data.csv`` up to ``scale`` times its size
+and runs in its own worker process, so peak memory is not shared between
+scales. A worker times, in order:
+
+- ``load``: CSV parse plus Parquet snapshot write, then the snapshot read.
+- ``aggregate``: building the aggregate cube and the filter bitmap index,
+  and the Arrow engine's cube query over the snapshot.
+- ``charts``: rendering every Visualizations chart from the cube, and
+  ``charts_vega``: building the interactive Vega-Lite spec of each one.
+- ``insights``: the chi-square tests, trends and rankings of the Insights
+  section.
+- ``clustering``: the sampled K-Prototypes fit, and the full fit up to
+  ``--full-fit-max-rows``.
+- ``app``: Streamlit's ``AppTest`` driving every section and every chart of
+  page.py against the synthetic file.
+
+The report also has an ``imports`` entry, independent of scale. It opens the
+login screen, and each section first, in a fresh interpreter, and records
+the wall time, the ``-X importtime`` total and the heavy packages imported
+on the way. It compares them with opening every section in one session.
+
+Every step records wall time, CPU time and the peak growth in resident memory
+while it ran. The JSON report ends with a ``scaling`` summary that ranks each
+step by its slowdown from the smallest to the largest scale.
+
+    python bench.py --soak 100
+
+instead re-renders every chart ``100`` times on ``data.csv``, in light and
+dark themes and bypassing the figure cache. It fails unless resident memory
+plateaus after the first rounds and no figure is left open.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from pathlib import Path
+
+import pandas as pd
+
+from instrumentation import rss_bytes
+
+BASE_DIR = Path(__file__).resolve().parent
+SOURCE_PATH = BASE_DIR / "data.csv"
+DEFAULT_SCALES = [1, 10, 100]
+FULL_FIT_MAX_ROWS = 20_000
+# Allowed resident-memory growth after the soak's warm-up rounds
+SOAK_TOLERANCE_BYTES = 8 * 1024 * 1024
+
+
+class PeakRSS:
+    """Sample this process's resident memory in a thread; Linux only, else ``None``."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = self.start = None
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, rss_bytes())
+
+    def __enter__(self):
+        self.start = self.peak = rss_bytes()
+        if self.start is not None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is not None:
+            self._stop.set()
+            self._thread.join()
+            self.peak = max(self.peak, rss_bytes())
+
+    @property
+    def delta(self):
+        return None if self.start is None else self.peak - self.start
+
+
+def measure(fn, *args, **kwargs):
+    """Run ``fn`` once; return its result and a timing/memory record."""
+    with PeakRSS() as rss:
+        wall, cpu = time.perf_counter(), time.process_time()
+        result = fn(*args, **kwargs)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return result, {'seconds': round(wall, 4), 'cpu_seconds': round(cpu, 4), 'peak_rss_delta_bytes': rss.delta}
+
+
+def make_dataset(scale, path, seed=0):
+    """Write ``data.csv`` resampled with replacement to ``scale`` times its rows."""
+    source = pd.read_csv(SOURCE_PATH)
+    if scale != 1:
+        source = source.sample(n=int(len(source) * scale), replace=True, random_state=seed)
+    source.to_csv(path, index=False)
+    return len(source)
+
+
+def bench_components(path, work_dir, full_fit_max_rows):
+    from aggregates import AggregateCube
+    from charts import CHART_SPECS, draw_chart
+    from clustering import default_sample_size, fit_kprototypes, fit_kprototypes_sampled
+    from data_loader import CATEGORICAL_COLUMNS, dataset_version, load_dataset, snapshot_path
+    from figure_cache import render_figure
+    from filters import BitmapIndex
+    from insights_engine import compute_insights
+    from query_engine import ArrowEngine
+    from shared_cache import DiskCache
+    from vega_charts import vega_chart
+
+    report = {}
+    snapshot_dir = Path(work_dir) / 'snapshots'
+    _, report['load_csv'] = measure(load_dataset, path, snapshot_dir)
+    df, report['load_snapshot'] = measure(load_dataset, path, snapshot_dir)
+    version = dataset_version(path)
+
+    cube, report['aggregate_cube'] = measure(AggregateCube.from_frame, df)
+    _, report['aggregate_index'] = measure(BitmapIndex.from_frame, df)
+    engine = ArrowEngine(snapshot_path(path, snapshot_dir), Path(work_dir) / 'ingested')
+    categories = {col: df[col].cat.categories for col in CATEGORICAL_COLUMNS}
+    _, report['aggregate_arrow'] = measure(engine.cube, (), categories, [''])
+
+    charts = {}
+    for title, spec in CHART_SPECS.items():
+        image, charts[title] = measure(render_figure, draw_chart, spec, cube, figsize=spec.figsize)
+        charts[title]['bytes'] = len(image)
+    report['charts'] = charts
+
+    # The interactive backend's server work: build the Vega-Lite spec and serialize it
+    vega = {}
+    for title, spec in CHART_SPECS.items():
+        payload, vega[title] = measure(lambda: json.dumps(vega_chart(spec, cube).to_dict()))
+        vega[title]['bytes'] = len(payload)
+    report['charts_vega'] = vega
+    _, report['insights'] = measure(compute_insights, cube)
+
+    # A cache of its own, so the fits are timed cold whatever the app cached before
+    cluster_cache = DiskCache(Path(work_dir) / 'bench-clusters')
+    sample_size = default_sample_size(len(df))
+    result, report['cluster_sampled'] = measure(fit_kprototypes_sampled, df, version, sample_size, cache=cluster_cache)
+    report['cluster_sampled'].update(sample_rows=sample_size, n_iter=result.n_iter)
+    if len(df) <= full_fit_max_rows:
+        result, report['cluster_full'] = measure(fit_kprototypes, df, version, cache=cluster_cache)
+        report['cluster_full']['n_iter'] = result.n_iter
+    else:
+        report['cluster_full'] = {'skipped': f"{len(df)} rows > --full-fit-max-rows {full_fit_max_rows}"}
+    return report
+
+
+def bench_app(full_fit):
+    """Drive page.py through every section and chart with ``AppTest``."""
+    from streamlit.testing.v1 import AppTest
+
+    from dashboard import SECTIONS
+
+    app = AppTest.from_file(str(BASE_DIR / 'page.py'), default_timeout=3600)
+    app.session_state['authenticated'] = True
+    _, first_run = measure(app.run)
+    report = {'first_run': first_run, 'sections': {}, 'charts': {}, 'errors': []}
+
+    def step(record, name, element):
+        _, record[name] = measure(element.run)
+        if app.exception:
+            report['errors'].append(f"{name}: {app.exception[0].message}")
+
+    for script, section in SECTIONS:
+        if section == 'Clustering Results' and not full_fit:
+            report['sections'][section] = {'skipped': 'full fit disabled at this scale'}
+            continue
+        step(report['sections'], section, app.switch_page(script))
+        if section == 'Visualizations':
+            for title in app.selectbox[0].options:
+                step(report['charts'], title, app.selectbox[0].set_value(title))
+    return report
+
+
+# Run in a fresh ``python -X importtime`` interpreter: open page.py's login
+# screen, or sign in and open the given sections in turn, as a new session would
+_FIRST_OPEN = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+scripts = {scripts!r}
+app = AppTest.from_file({page!r}, default_timeout=3600)
+if scripts:
+    app.session_state['authenticated'] = True
+    app.switch_page(scripts[0])
+before = set(sys.modules)
+print({marker!r}, file=sys.stderr, flush=True)
+start = time.perf_counter()
+app.run()
+for script in scripts[1:]:
+    app.switch_page(script).run()
+print(json.dumps({{
+    'seconds': time.perf_counter() - start,
+    'modules': sorted(set(sys.modules) - before),
+    'errors': [exception.message for exception in app.exception],
+}}))
+"""
+_MARKER = '--- first open ---'
+# Reported by name when opening a section imports them
+HEAVY_MODULES = ['pandas', 'numpy', 'pyarrow', 'scipy', 'sklearn', 'matplotlib', 'seaborn', 'kmodes', 'altair']
+
+
+def first_open(scripts=()):
+    """Cost of a new session opening ``scripts`` in turn, or the login screen without any.
+
+    Runs in a fresh interpreter on a cold cache directory, with the warm-up off,
+    so everything the sections import or load lazily through ``dashboard`` is
+    counted. ``import_seconds`` sums the ``-X importtime`` entries recorded
+    while the page ran; Streamlit itself is already imported by then.
+    """
+    with tempfile.TemporaryDirectory(prefix='dashboard-imports-') as work_dir:
+        env = dict(os.environ, DASHBOARD_CACHE_DIR=work_dir, DASHBOARD_WARMUP='0', MPLBACKEND='Agg')
+        env.pop('DASHBOARD_SHARED_CACHE_PATH', None)
+        code = _FIRST_OPEN.format(scripts=list(scripts), page=str(BASE_DIR / 'page.py'), marker=_MARKER)
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code], env=env, cwd=BASE_DIR, capture_output=True, text=True,
+            check=True
+        )
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    microseconds = 0
+    for line in process.stderr.split(_MARKER, 1)[-1].splitlines():
+        fields = line.removeprefix('import time:').split('|')
+        # Top-level entries have a single leading space; nested imports are indented further
+        if len(fields) == 3 and fields[1].strip().isdigit() and not fields[2].startswith('  '):
+            microseconds += int(fields[1])
+    packages = {module.partition('.')[0] for module in result['modules']}
+    return {
+        'seconds': round(result['seconds'], 3),
+        'import_seconds': round(microseconds / 1e6, 3),
+        'modules': len(result['modules']),
+        'heavy': [module for module in HEAVY_MODULES if module in packages],
+        'errors': result['errors'],
+    }
+
+
+def import_report():
+    """First-open cost of the login screen and of each section, from a fresh process.
+
+    ``all_sections`` opens every section in one session, as the single-script
+    page loaded everything on every start.
+    """
+    from dashboard import SECTIONS
+
+    return {
+        'login': first_open(),
+        'sections': {title: first_open([script]) for script, title in SECTIONS},
+        'all_sections': first_open([script for script, _ in SECTIONS]),
+    }
+
+
+def soak(rounds, tolerance_bytes=SOAK_TOLERANCE_BYTES):
+    """Re-render every chart ``rounds`` times; check that resident memory plateaus.
+
+    Resident memory is sampled after every round. The baseline is the
+    median over the rounds just after the first tenth, by when the
+    allocator and font caches have settled. The check fails if the median
+    over the last quarter exceeds it by more than ``tolerance_bytes``, or
+    if any figure is still open at the end. The operation recorder is
+    cleared every round: its log is bounded separately, by ``MAX_RECORDS``.
+    """
+    import statistics
+
+    import matplotlib.pyplot as plt
+
+    from aggregates import AggregateCube
+    from charts import CHART_SPECS, draw_chart
+    from data_loader import load_dataset
+    from figure_cache import FIGURE_BUDGET, render_figure
+    from instrumentation import RECORDER
+
+    with tempfile.TemporaryDirectory(prefix='dashboard-soak-') as work_dir:
+        cube = AggregateCube.from_frame(load_dataset(SOURCE_PATH, work_dir))
+    samples = []
+    start = time.perf_counter()
+    for round_number in range(rounds):
+        theme = ('light', 'dark')[round_number % 2]
+        for spec in CHART_SPECS.values():
+            render_figure(draw_chart, spec, cube, figsize=spec.figsize, theme=theme)
+        RECORDER.clear()
+        samples.append(rss_bytes())
+    warm = max(1, rounds // 10)
+    baseline = int(statistics.median(samples[warm:2 * warm]))
+    final = int(statistics.median(samples[-max(1, rounds // 4):]))
+    report = {
+        'renders': rounds * len(CHART_SPECS),
+        'seconds': round(time.perf_counter() - start, 1),
+        'baseline_rss_bytes': baseline,
+        'final_rss_bytes': final,
+        'growth_bytes': final - baseline,
+        'tolerance_bytes': tolerance_bytes,
+        'live_figures': FIGURE_BUDGET.live(),
+        'pyplot_figures': len(plt.get_fignums()),
+        # About 20 evenly spaced samples, to show the curve
+        'rss_samples': samples[::max(1, rounds // 20)],
+    }
+    report['plateaued'] = (
+        report['growth_bytes'] <= tolerance_bytes and not report['live_figures'] and not report['pyplot_figures']
+    )
+    return report
+
+
+def run_worker(scale, full_fit_max_rows, skip_app):
+    """Benchmark one scale in this process; called through ``--worker``."""
+    warnings.simplefilter('ignore')
+    data_path = Path(os.environ['DASHBOARD_DATA_PATH'])
+    work_dir = Path(os.environ['DASHBOARD_CACHE_DIR'])
+    rows, generate = measure(make_dataset, scale, data_path)
+    report = {'scale': scale, 'rows': rows, 'generate': generate}
+    report.update(bench_components(data_path, work_dir, full_fit_max_rows))
+    if not skip_app:
+        report['app'] = bench_app(full_fit=rows <= full_fit_max_rows)
+    # ru_maxrss is in KiB on Linux
+    report['max_rss_bytes'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return report
+
+
+def _flat_timings(report, prefix=''):
+    for name, value in report.items():
+        if isinstance(value, dict) and 'seconds' in value:
+            yield prefix + name, value['seconds']
+        elif isinstance(value, dict):
+            yield from _flat_timings(value, f"{prefix}{name}/")
+
+
+def scaling_summary(reports):
+    """Slowdown of every timed step between the smallest and largest scale."""
+    if len(reports) < 2:
+        return []
+    small, large = dict(_flat_timings(reports[0])), dict(_flat_timings(reports[-1]))
+    row_ratio = reports[-1]['rows'] / reports[0]['rows']
+    summary = [
+        {'step': step, 'slowdown': round(large[step] / small[step], 2) if small[step] else None, 'row_ratio': row_ratio}
+        for step in small if step in large
+    ]
+    return sorted(summary, key=lambda item: item['slowdown'] or 0, reverse=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=float, nargs='+', default=DEFAULT_SCALES)
+    parser.add_argument('--output', default='bench.json', help="JSON report path ('-' for stdout)")
+    parser.add_argument('--full-fit-max-rows', type=int, default=FULL_FIT_MAX_ROWS)
+    parser.add_argument('--skip-app', action='store_true', help="skip the AppTest pass over page.py")
+    parser.add_argument('--soak', type=int, metavar='ROUNDS', help="re-render every chart ROUNDS times instead")
+    parser.add_argument('--worker', type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.soak is not None:
+        warnings.simplefilter('ignore')
+        report = soak(args.soak)
+        json.dump(report, sys.stdout, indent=2)
+        print(file=sys.stdout)
+        if not report['plateaued']:
+            sys.exit(f"memory grew by {report['growth_bytes'] / 1024 ** 2:.1f} MiB after warm-up")
+        return
+
+    if args.worker is not None:
+        json.dump(run_worker(args.worker, args.full_fit_max_rows, args.skip_app), sys.stdout)
+        return
+
+    reports = []
+    for scale in sorted(args.scales):
+        with tempfile.TemporaryDirectory(prefix='dashboard-bench-') as work_dir:
+            env = dict(
+                os.environ,
+                DASHBOARD_DATA_PATH=str(Path(work_dir) / f"data-x{scale:g}.csv"),
+                DASHBOARD_CACHE_DIR=work_dir,
+                DASHBOARD_BATCH_DIR=str(Path(work_dir) / 'ingested'),
+                DASHBOARD_WARMUP='0',
+                MPLBACKEND='Agg',
+            )
+            command = [sys.executable, __file__, '--worker', str(scale), '--full-fit-max-rows', str(args.full_fit_max_rows)]
+            if args.skip_app:
+                command.append('--skip-app')
+            print(f"scale x{scale:g}...", file=sys.stderr, flush=True)
+            worker = subprocess.run(command, env=env, cwd=BASE_DIR, capture_output=True, text=True)
+            if worker.returncode:
+                sys.exit(f"scale x{scale:g} failed:\n{worker.stderr}")
+            reports.append(json.loads(worker.stdout))
+
+    result = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'imports': import_report(),
+        'scales': reports,
+        'scaling': scaling_summary(reports),
+    }
+    if args.output == '-':
+        json.dump(result, sys.stdout, indent=2)
+    else:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        print(f"wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+"""Dashboard charts, each drawn onto a given Axes.
+
+The Visualizations charts are declared as ``ChartSpec`` entries in
+``CHART_SPECS``. One engine executes them: ``chart_table`` reads the spec's
+aggregate from the aggregate cube, and ``draw_chart`` draws that table with
+the drawer for the spec's kind. Adding a chart is one registry entry.
+
+The clustering charts read from clustering results.
+"""
+import numpy as np
+import seaborn as sns
+from matplotlib.artist import setp
+from matplotlib.patches import Patch
+
+
+class ChartSpec:
+    """Declarative description of one Visualizations chart.
+
+    ``dimensions`` are the grouping columns: one for a series, two for a
+    crosstab (rows, then the stacked or grouped series). ``aggregate`` is
+    ``count``, ``mean`` or ``median`` of ``value``; ``distribution`` gives
+    box-plot statistics of ``value``. ``kind`` picks the drawer and
+    ``palette`` is its colour, palette name, colormap or colour list.
+    ``options`` are passed through to the underlying plotting call.
+    """
+
+    def __init__(self, name, kind, dimensions, aggregate='count', value=None, palette=None, title=None,
+                 xlabel=None, ylabel=None, legend_title=None, sort=False, band=False, figsize=(8, 6),
+                 title_size=14, label_size=12, rotation=None, ha=None, grid=False, legend_x=1.05, options=None):
+        self.name = name
+        self.kind = kind
+        self.dimensions = tuple(dimensions)
+        self.aggregate = aggregate
+        self.value = value
+        self.palette = palette
+        self.title = title or name
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        self.legend_title = legend_title
+        self.sort = sort
+        self.band = band
+        self.figsize = figsize
+        self.title_size = title_size
+        self.label_size = label_size
+        self.rotation = rotation
+        self.ha = ha
+        self.grid = grid
+        self.legend_x = legend_x
+        self.options = options or {}
+
+    def __repr__(self):
+        return f"ChartSpec({self.name!r}, {self.kind!r}, {self.dimensions!r}, {self.aggregate!r})"
+
+
+def chart_table(spec, cube):
+    """The aggregated table a spec draws: a Series, a crosstab or box statistics."""
+    if spec.aggregate == 'distribution':
+        return cube.box_stats(spec.value, by=spec.dimensions[0] if spec.dimensions else None)
+    if spec.aggregate == 'count':
+        table = cube.counts(*spec.dimensions) if len(spec.dimensions) == 1 else cube.crosstab(*spec.dimensions)
+    elif spec.aggregate == 'mean':
+        table = cube.mean(spec.dimensions[0], spec.value)
+        if spec.band:
+            sem = cube.sem(spec.dimensions[0], spec.value)
+            table = table.to_frame('mean').assign(low=table - 1.96 * sem, high=table + 1.96 * sem)
+    elif spec.aggregate == 'median':
+        table = cube.median(spec.dimensions[0], spec.value)
+    else:
+        raise ValueError(f"unknown aggregate {spec.aggregate!r} in {spec!r}")
+    return table.sort_values(ascending=False) if spec.sort else table
+
+
+def _draw_bar(ax, spec, table):
+    sns.barplot(
+        x=table.index, y=table.values, order=table.index, palette=spec.palette, edgecolor='black', ax=ax,
+        **spec.options
+    )
+
+
+def _draw_hist(ax, spec, table):
+    # The KDE needs at least two distinct values, e.g. not a single-year view
+    sns.histplot(
+        x=table.index, weights=table.values, kde=len(table) > 1, color=spec.palette, edgecolor='black', ax=ax,
+        **{'bins': 20, **spec.options}
+    )
+
+
+def _draw_line(ax, spec, table):
+    sns.lineplot(x=table.index, y=table['mean'].values, marker='o', color=spec.palette, linewidth=3, ax=ax)
+    ax.fill_between(table.index, table['low'], table['high'], color=spec.palette, alpha=0.2)
+    ax.grid(True, linestyle='--', alpha=0.6)
+
+
+def _draw_box(ax, spec, table):
+    ax.bxp(table, patch_artist=True, boxprops={'facecolor': spec.palette}, medianprops={'color': 'black'}, **spec.options)
+    if not spec.dimensions:
+        ax.set_yticks([])
+
+
+def _draw_pie(ax, spec, table):
+    ax.pie(
+        table,
+        labels=table.index,
+        autopct='%1.1f%%',
+        startangle=90,
+        colors=spec.palette,
+        wedgeprops={'linewidth': 3, 'edgecolor': 'white'},
+        labeldistance=1.1
+    )
+
+
+def _draw_crosstab(ax, spec, table):
+    table.plot(
+        kind='bar', stacked=spec.kind == 'stacked_bar', colormap=spec.palette, edgecolor='black', ax=ax,
+        **spec.options
+    )
+    ax.legend(title=spec.legend_title, bbox_to_anchor=(spec.legend_x, 1), loc='upper left')
+
+
+DRAWERS = {
+    'bar': _draw_bar,
+    'hist': _draw_hist,
+    'line': _draw_line,
+    'box': _draw_box,
+    'pie': _draw_pie,
+    'stacked_bar': _draw_crosstab,
+    'grouped_bar': _draw_crosstab,
+}
+
+
+def draw_chart(ax, spec, cube):
+    """Draw ``spec`` on ``ax`` from the aggregate cube."""
+    DRAWERS[spec.kind](ax, spec, chart_table(spec, cube))
+    ax.set_title(spec.title, fontsize=spec.title_size)
+    if spec.xlabel:
+        ax.set_xlabel(spec.xlabel, fontsize=spec.label_size)
+    if spec.ylabel:
+        ax.set_ylabel(spec.ylabel, fontsize=spec.label_size)
+    if spec.rotation is not None:
+        setp(ax.get_xticklabels(), rotation=spec.rotation, **({'ha': spec.ha} if spec.ha else {}))
+    if spec.grid:
+        ax.grid(axis='y', alpha=0.3)
+    if spec.legend_title:
+        ax.figure.tight_layout()
+
+
+CASES = 'Number of Cases'
+AGE = 'VICTIM AGE'
+DURATION = 'DURATION (MONTHS)'
+
+# In selectbox order
+CHART_SPECS = {spec.name: spec for spec in [
+    ChartSpec("Age Distribution of Victims", 'hist', [AGE], palette='#008080', title_size=12,
+              xlabel='Age of Victims', ylabel=CASES),
+    ChartSpec("Age Range of Victims", 'box', [], 'distribution', AGE, palette='#FF6347',
+              xlabel='Age of Victims', options={'vert': False}),
+    ChartSpec("Yearly Frequency of Harassment Cases", 'bar', ['INCIDENT YEAR'], palette='Dark2',
+              xlabel='Year of Incident', ylabel=CASES, rotation=90),
+    ChartSpec("Harassment Cases Over the Years: Histogram and KDE", 'hist', ['INCIDENT YEAR'], palette='#008080',
+              xlabel='Year of Incident', ylabel=CASES, options={'alpha': 0.6}),
+    ChartSpec("Duration of Harassment Cases (in Months)", 'bar', [DURATION], palette='husl',
+              xlabel='Duration (Months)', ylabel=CASES),
+    ChartSpec("Percentage Distribution of Harassment Types", 'pie', ['TYPE OF HARASSMENT'], sort=True,
+              palette=['#4DB6AC', '#FFC107', '#7E57C2']),
+    ChartSpec("State-Wise Distribution of Harassment Cases", 'bar', ['LOCATION (STATE)'], palette='Spectral',
+              xlabel='State', ylabel=CASES, rotation=90),
+    ChartSpec("Actions Taken Against Harassment Cases", 'bar', ['ACTION TAKEN'], palette='magma',
+              xlabel='Type of Action Taken', ylabel=CASES, rotation=90),
+    ChartSpec("Victim Age Across Different Education Levels", 'line', ['EDUCATION LEVEL'], 'mean', AGE,
+              palette='teal', band=True, xlabel='Education Level', ylabel='Victim Age', rotation=90),
+    ChartSpec("Victim Age by Type of Harassment", 'box', ['TYPE OF HARASSMENT'], 'distribution', AGE,
+              palette='#9B59B6', figsize=(9, 6), xlabel='Type of Harassment', ylabel='Victim Age', rotation=90),
+    ChartSpec("Harassment Type Across Education Levels", 'stacked_bar', ['EDUCATION LEVEL', 'TYPE OF HARASSMENT'],
+              palette='viridis', title_size=12, xlabel='Education Level', ylabel=CASES,
+              legend_title='Type of Harassment', rotation=90),
+    ChartSpec("Harassment Cases Across Social Media Platforms", 'bar', ['SOCIAL MEDIA PLATFORM'], sort=True,
+              palette='inferno', xlabel='Social Media Platform', ylabel='Number of Harassment Cases', rotation=90),
+    ChartSpec("State-Wise Harassment Types", 'stacked_bar', ['LOCATION (STATE)', 'TYPE OF HARASSMENT'],
+              palette='coolwarm', figsize=(10, 6), title='State-Wise Harassment Types: A Stacked View',
+              xlabel='State', ylabel=CASES, legend_title='Type of Harassment', rotation=90),
+    ChartSpec("Trends in Harassment Types by Incident Year", 'stacked_bar', ['INCIDENT YEAR', 'TYPE OF HARASSMENT'],
+              palette='Spectral', title_size=12, xlabel='Year of Incident', ylabel=CASES,
+              legend_title='Type of Harassment', rotation=90),
+    ChartSpec("Average Harassment Duration by Victim Age", 'bar', [AGE], 'mean', DURATION, palette='Blues_d',
+              figsize=(10, 6), xlabel='Victim Age', ylabel='Average Duration (Months)', rotation=0, grid=True),
+    ChartSpec("Education Levels and Actions Results", 'stacked_bar', ['EDUCATION LEVEL', 'OUTCOME/RESULTS'],
+              palette='icefire', figsize=(10, 6), title_size=12, xlabel='Education Level', ylabel='Actions Results',
+              legend_title='Actions Results', rotation=90),
+    ChartSpec("Action Taken and Actions Results", 'grouped_bar', ['ACTION TAKEN', 'OUTCOME/RESULTS'],
+              palette='viridis_r', xlabel='Action Taken', ylabel='Actions Results', legend_title='Actions results',
+              rotation=90),
+    ChartSpec("Total Results Across Different States", 'bar', ['LOCATION (STATE)'], palette='viridis',
+              xlabel='State', ylabel='Total Results', rotation=90, ha='right', grid=True),
+    ChartSpec("Average Duration of Harassment by Social Media Platform", 'bar', ['SOCIAL MEDIA PLATFORM'], 'mean',
+              DURATION, palette='coolwarm', xlabel='Social Media Platform', ylabel='Average Duration (Months)',
+              rotation=90, ha='right', grid=True),
+    ChartSpec("Action Results Over the Years", 'grouped_bar', ['INCIDENT YEAR', 'OUTCOME/RESULTS'],
+              palette='inferno', xlabel='Year of Incident', ylabel='Number of Action Results',
+              legend_title='Action Results', rotation=90, ha='right', grid=True),
+    ChartSpec("Actions Taken Across Harassment Types", 'stacked_bar', ['TYPE OF HARASSMENT', 'ACTION TAKEN'],
+              palette='flare', figsize=(10, 8), xlabel='Type of Harassment', ylabel='Number of Actions Taken',
+              legend_title='Action Taken', rotation=90),
+    ChartSpec("Average Harassment Duration by Action Results", 'bar', ['OUTCOME/RESULTS'], 'mean', DURATION,
+              palette='mako', figsize=(10, 8), xlabel='Action Results', ylabel='Average Duration (Months)',
+              rotation=90, ha='right', grid=True),
+    ChartSpec("Median Age of Victims Across Social Media Platforms", 'bar', ['SOCIAL MEDIA PLATFORM'], 'median', AGE,
+              palette='rocket', figsize=(10, 8), xlabel='Social Media Platform', ylabel='Median Victim Age',
+              rotation=90, ha='right', grid=True),
+    ChartSpec("Education Level vs. Social Media Platform Usage", 'grouped_bar',
+              ['EDUCATION LEVEL', 'SOCIAL MEDIA PLATFORM'], palette='Paired', figsize=(15, 10), title_size=30,
+              label_size=20, xlabel='Education Level', ylabel=CASES, legend_title='Social Media Platform',
+              rotation=60, legend_x=1.01, options={'width': 0.9}),
+]}
+
+
+def k_sweep(ax, sweep):
+    """Elbow chart: K-Prototypes cost per k for each init, silhouette on a twin axis."""
+    for init, runs in sweep.groupby('init'):
+        ax.plot(runs['k'], runs['cost'], marker='o', linewidth=2, label=f'Cost ({init})')
+    ax.set_title('Choosing the Number of Clusters', fontsize=14)
+    ax.set_xlabel('Number of Clusters (k)', fontsize=12)
+    ax.set_ylabel('Cost', fontsize=12)
+    ax.set_xticks(sorted(sweep['k'].unique()))
+    ax.grid(axis='y', alpha=0.3)
+    silhouette_ax = ax.twinx()
+    for init, runs in sweep.groupby('init'):
+        silhouette_ax.plot(runs['k'], runs['silhouette'], marker='s', linestyle='--', label=f'Silhouette ({init})')
+    silhouette_ax.set_ylabel('Silhouette Score', fontsize=12)
+    handles, labels = ax.get_legend_handles_labels()
+    more_handles, more_labels = silhouette_ax.get_legend_handles_labels()
+    ax.legend(handles + more_handles, labels + more_labels, loc='upper right')
+
+
+def cluster_sizes(ax, sizes):
+    """Bar chart of cases per cluster from a cluster -> count Series."""
+    sns.barplot(x=sizes.index, y=sizes.values, palette='viridis', edgecolor='black', ax=ax)
+    ax.set_title('Distribution of Clusters', fontsize=14)
+    ax.set_xlabel('Cluster', fontsize=12)
+    ax.set_ylabel('Number of Cases', fontsize=12)
+
+
+def _bin_edges(centres):
+    if len(centres) == 1:
+        return np.array([centres[0] - 0.5, centres[0] + 0.5])
+    mids = (centres[:-1] + centres[1:]) / 2
+    return np.concatenate([[2 * centres[0] - mids[0]], mids, [2 * centres[-1] - mids[-1]]])
+
+
+def cluster_pairplot(axes, counts, clusters, centres, columns, overlay=None):
+    """Binned pair plot of the numeric columns per cluster.
+
+    ``counts`` is the (cluster, *bins) array from ``aggregates.joint_counts``.
+    Off-diagonal cells show the majority cluster of each 2-D bin, shaded by
+    how many cases fall in it. The diagonal shows each cluster's histogram.
+    ``overlay`` is an optional small frame of sampled cases drawn as jittered
+    points.
+    """
+    colors = np.asarray(sns.color_palette('viridis', len(clusters)))
+    n = len(columns)
+    for i in range(n):
+        for j in range(n):
+            ax = axes[i, j]
+            if i == j:
+                other = tuple(axis for axis in range(1, n + 1) if axis != i + 1)
+                marginal = counts.sum(axis=other)
+                for cluster, color, row in zip(clusters, colors, marginal):
+                    ax.stairs(row, _bin_edges(centres[i]), color=color, linewidth=2)
+            else:
+                other = tuple(axis for axis in range(1, n + 1) if axis not in (i + 1, j + 1))
+                grid = counts.sum(axis=other)
+                # Axes are ordered (cluster, min(i, j), max(i, j)); put column i on y
+                if i > j:
+                    grid = grid.transpose(0, 2, 1)
+                total = grid.sum(axis=0)
+                rgba = np.zeros((*total.shape, 4))
+                rgba[..., :3] = colors[grid.argmax(axis=0)]
+                rgba[..., 3] = np.sqrt(total / total.max()) if total.max() else 0
+                ax.pcolormesh(_bin_edges(centres[j]), _bin_edges(centres[i]), rgba, shading='flat')
+                if overlay is not None:
+                    jitter = np.random.default_rng(0).uniform(-0.3, 0.3, size=(len(overlay), 2))
+                    ax.scatter(
+                        overlay[columns[j]] + jitter[:, 0],
+                        overlay[columns[i]] + jitter[:, 1],
+                        c=colors[np.searchsorted(clusters, overlay['Cluster'])],
+                        s=6,
+                        edgecolors='black',
+                        linewidths=0.2
+                    )
+            if i == n - 1:
+                ax.set_xlabel(columns[j], fontsize=10)
+            if j == 0:
+                ax.set_ylabel(columns[i], fontsize=10)
+    axes[0, 0].figure.legend(
+        handles=[Patch(color=color, label=str(cluster)) for cluster, color in zip(clusters, colors)],
+        title='Cluster',
+        loc='center left',
+        bbox_to_anchor=(1.0, 0.5)
+    )
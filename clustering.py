@@ -0,0 +1,334 @@
+"""Memoized K-Prototypes clustering of the case table.
+
+A fit is identified by the dataset version, the columns used, ``k``, the
+``init`` strategy and the random seed. Results are kept in the shared cache
+(see ``shared_cache``), so the fit runs once per combination, across
+restarts and across Streamlit replicas on the host.
+
+``fit_kprototypes_sampled`` is the scalable mode for large case tables: it
+fits on a stratified row sample with integer-coded categoricals and assigns
+every row to its nearest prototype in vectorized chunks.
+
+``sweep_kprototypes`` fits a grid of ``k`` values and ``init`` strategies in
+a process pool. Every run goes through the same shared cache, so picking a
+``k`` from the sweep later is a cache hit.
+"""
+import hashlib
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_loader import CATEGORICAL_COLUMNS, NUMERIC_COLUMNS
+from instrumentation import span
+from shared_cache import shared_cache
+
+SWEEP_K_VALUES = list(range(2, 9))
+SWEEP_INITS = ['Cao', 'Huang']
+SILHOUETTE_SAMPLE = 1000
+
+SAMPLE_STRATA = ['INCIDENT YEAR', 'LOCATION (STATE)']
+ASSIGN_CHUNK_ROWS = 65536
+
+
+class ClusterResult:
+    """Labels, centroids and fit statistics of one K-Prototypes run."""
+
+    def __init__(self, key, model, labels, centroids, categorical_columns, numeric_columns, fit_seconds):
+        self.key = key
+        self.model = model
+        self.labels = labels
+        self.centroids = centroids
+        self.categorical_columns = categorical_columns
+        self.numeric_columns = numeric_columns
+        self.fit_seconds = fit_seconds
+
+    @property
+    def n_clusters(self):
+        return self.model.n_clusters
+
+    @property
+    def cost(self):
+        return self.model.cost_
+
+    @property
+    def n_iter(self):
+        return self.model.n_iter_
+
+    def assign(self, df):
+        """Return a copy of ``df`` with a ``Cluster`` column; ``df`` is left untouched."""
+        return df.assign(Cluster=self.labels)
+
+
+def feature_matrix(df, categorical_columns=CATEGORICAL_COLUMNS, numeric_columns=NUMERIC_COLUMNS):
+    """Object array in the layout K-Prototypes expects: categoricals first, as strings."""
+    frame = df[categorical_columns + numeric_columns].astype({col: str for col in categorical_columns})
+    return frame.to_numpy(dtype=object)
+
+
+def category_codes(df, columns):
+    """Integer code matrix for ``columns``; categoricals use their dtype codes."""
+    return np.column_stack([
+        df[col].cat.codes.to_numpy() if isinstance(df[col].dtype, pd.CategoricalDtype) else pd.factorize(df[col], sort=True)[0]
+        for col in columns
+    ])
+
+
+def cluster_key(data_version, categorical_columns, numeric_columns, n_clusters, init, random_state, *options):
+    parts = (data_version, tuple(categorical_columns), tuple(numeric_columns), n_clusters, init, random_state, *options)
+    return hashlib.sha256(repr(parts).encode()).hexdigest()[:16]
+
+
+def _centroid_frame(model, categorical_columns, numeric_columns):
+    # kmodes stores centroids numeric-first, as one object/str array
+    centroids = pd.DataFrame(model.cluster_centroids_, columns=numeric_columns + categorical_columns)
+    centroids = centroids.astype({col: float for col in numeric_columns})
+    centroids.index.name = 'Cluster'
+    return centroids[categorical_columns + numeric_columns]
+
+
+def _fit_full(df, key, categorical_columns, numeric_columns, n_clusters, init, random_state):
+    from kmodes.kprototypes import KPrototypes
+
+    start = time.perf_counter()
+    model = KPrototypes(n_clusters=n_clusters, init=init, random_state=random_state)
+    labels = model.fit_predict(
+        feature_matrix(df, categorical_columns, numeric_columns),
+        categorical=list(range(len(categorical_columns)))
+    )
+    return ClusterResult(
+        key,
+        model,
+        np.asarray(labels, dtype=np.int16),
+        _centroid_frame(model, categorical_columns, numeric_columns),
+        list(categorical_columns),
+        list(numeric_columns),
+        time.perf_counter() - start,
+    )
+
+
+def fit_kprototypes(df, data_version, categorical_columns=CATEGORICAL_COLUMNS, numeric_columns=NUMERIC_COLUMNS,
+                    n_clusters=3, init='Cao', random_state=42, cache=None):
+    """Fit K-Prototypes on ``df``, reusing a persisted result for the same key."""
+    key = cluster_key(data_version, categorical_columns, numeric_columns, n_clusters, init, random_state)
+    cache = shared_cache() if cache is None else cache
+    with span('cluster_fit', f"k={n_clusters} {init}") as current:
+        result = cache.get(('clusters', key))
+        current.cache = 'miss' if result is None else 'hit'
+        if result is None:
+            result = _fit_full(df, key, categorical_columns, numeric_columns, n_clusters, init, random_state)
+            cache.put(('clusters', key), result)
+    return result
+
+
+def cluster_options(df, k_values=SWEEP_K_VALUES, categorical_columns=CATEGORICAL_COLUMNS,
+                    numeric_columns=NUMERIC_COLUMNS):
+    """The ``k_values`` that ``df`` has enough distinct rows to fit.
+
+    Necessary but not sufficient: K-Prototypes can still fail to initialise
+    with close to one distinct row per cluster, raising ``ValueError``.
+    """
+    distinct = len(df[categorical_columns + numeric_columns].drop_duplicates())
+    return [k for k in k_values if k <= distinct]
+
+
+def cached_fit(data_version, categorical_columns=CATEGORICAL_COLUMNS, numeric_columns=NUMERIC_COLUMNS,
+               n_clusters=3, init='Cao', random_state=42, cache=None):
+    """The persisted ``fit_kprototypes`` result for these arguments, or ``None``; never fits."""
+    key = cluster_key(data_version, categorical_columns, numeric_columns, n_clusters, init, random_state)
+    cache = shared_cache() if cache is None else cache
+    return cache.get(('clusters', key))
+
+
+def default_sample_size(n_rows):
+    """A quarter of the table, between 100 and 5000 rows."""
+    return min(n_rows, max(100, min(5000, n_rows // 4)))
+
+
+def stratified_sample(df, sample_size, strata=SAMPLE_STRATA, random_state=42):
+    """Row positions of a sample of about ``sample_size`` rows, proportional per stratum.
+
+    Every non-empty stratum keeps at least one row, so small states and years
+    are never dropped from the fit.
+    """
+    n = len(df)
+    if sample_size >= n:
+        return np.arange(n)
+    strata_codes = category_codes(df, strata)
+    groups = np.ravel_multi_index(strata_codes.T, strata_codes.max(axis=0) + 1)
+    _, group_index, group_sizes = np.unique(groups, return_inverse=True, return_counts=True)
+    quotas = np.maximum(1, np.round(group_sizes * sample_size / n)).astype(np.int64)
+    # Shuffle, then stable-sort by group: each row's rank within its group is random
+    rng = np.random.default_rng(random_state)
+    order = rng.permutation(n)
+    order = order[np.argsort(group_index[order], kind='stable')]
+    starts = np.concatenate([[0], np.cumsum(group_sizes)[:-1]])
+    rank = np.arange(n) - starts[group_index[order]]
+    return np.sort(order[rank < quotas[group_index[order]]])
+
+
+def assign_to_prototypes(numeric, codes, numeric_centroids, categorical_centroids, gamma, chunk_rows=ASSIGN_CHUNK_ROWS):
+    """Label each row with its nearest prototype under the K-Prototypes cost, in chunks."""
+    labels = np.empty(len(numeric), dtype=np.int16)
+    for start in range(0, len(numeric), chunk_rows):
+        stop = start + chunk_rows
+        cost = ((numeric[start:stop, None, :] - numeric_centroids[None, :, :]) ** 2).sum(axis=2)
+        cost += gamma * (codes[start:stop, None, :] != categorical_centroids[None, :, :]).sum(axis=2)
+        labels[start:stop] = cost.argmin(axis=1)
+    return labels
+
+
+def _fit_sampled(df, key, sample_size, categorical_columns, numeric_columns, n_clusters, init, random_state, strata):
+    from kmodes.kprototypes import KPrototypes
+
+    start = time.perf_counter()
+    codes = category_codes(df, categorical_columns)
+    numeric = df[numeric_columns].to_numpy(dtype=float)
+    rows = stratified_sample(df, sample_size, strata, random_state)
+    model = KPrototypes(n_clusters=n_clusters, init=init, random_state=random_state)
+    model.fit(np.hstack([codes[rows], numeric[rows]]), categorical=list(range(len(categorical_columns))))
+
+    n_numeric = len(numeric_columns)
+    centroids = np.asarray(model.cluster_centroids_, dtype=float)
+    numeric_centroids = centroids[:, :n_numeric]
+    categorical_centroids = centroids[:, n_numeric:].astype(np.int64)
+    labels = assign_to_prototypes(numeric, codes, numeric_centroids, categorical_centroids, model.gamma)
+
+    centroid_frame = pd.DataFrame(numeric_centroids, columns=numeric_columns)
+    for i, col in enumerate(categorical_columns):
+        values = df[col].cat.categories if isinstance(df[col].dtype, pd.CategoricalDtype) else pd.factorize(df[col], sort=True)[1]
+        centroid_frame[col] = np.asarray(values)[categorical_centroids[:, i]]
+    centroid_frame.index.name = 'Cluster'
+
+    return ClusterResult(
+        key,
+        model,
+        labels,
+        centroid_frame[categorical_columns + numeric_columns],
+        list(categorical_columns),
+        list(numeric_columns),
+        time.perf_counter() - start,
+    )
+
+
+def fit_kprototypes_sampled(df, data_version, sample_size, categorical_columns=CATEGORICAL_COLUMNS,
+                            numeric_columns=NUMERIC_COLUMNS, n_clusters=3, init='Cao', random_state=42,
+                            strata=SAMPLE_STRATA, cache=None):
+    """Fit K-Prototypes on a stratified sample and assign all rows to the prototypes."""
+    key = cluster_key(data_version, categorical_columns, numeric_columns, n_clusters, init, random_state,
+                      'sampled', sample_size, tuple(strata))
+    cache = shared_cache() if cache is None else cache
+    with span('cluster_fit', f"k={n_clusters} {init} sampled") as current:
+        result = cache.get(('clusters', key))
+        current.cache = 'miss' if result is None else 'hit'
+        if result is None:
+            result = _fit_sampled(df, key, sample_size, categorical_columns, numeric_columns, n_clusters, init,
+                                  random_state, strata)
+            cache.put(('clusters', key), result)
+    return result
+
+
+def label_agreement(labels, reference):
+    """Adjusted Rand index and best-matched share of rows between two labelings."""
+    from scipy.optimize import linear_sum_assignment
+    from sklearn.metrics import adjusted_rand_score
+
+    contingency = pd.crosstab(np.asarray(labels), np.asarray(reference)).to_numpy()
+    rows, cols = linear_sum_assignment(-contingency)
+    return {
+        'adjusted_rand': float(adjusted_rand_score(reference, labels)),
+        'matched_share': float(contingency[rows, cols].sum() / contingency.sum()),
+    }
+
+
+def mixed_silhouette(df, labels, gamma, categorical_columns=CATEGORICAL_COLUMNS, numeric_columns=NUMERIC_COLUMNS,
+                     sample_size=SILHOUETTE_SAMPLE, random_state=42):
+    """Silhouette score under the K-Prototypes dissimilarity, on a row sample.
+
+    The distance between two rows is their squared Euclidean distance over the
+    numeric columns plus ``gamma`` times the number of mismatched categoricals.
+    """
+    from sklearn.metrics import silhouette_score
+
+    labels = np.asarray(labels)
+    if len(np.unique(labels)) < 2:
+        return np.nan
+    rng = np.random.default_rng(random_state)
+    rows = rng.choice(len(df), size=min(sample_size, len(df)), replace=False)
+    numeric = df[numeric_columns].to_numpy(dtype=float)[rows]
+    codes = category_codes(df, categorical_columns)[rows]
+    distances = ((numeric[:, None, :] - numeric[None, :, :]) ** 2).sum(axis=2)
+    distances += gamma * (codes[:, None, :] != codes[None, :, :]).sum(axis=2)
+    np.fill_diagonal(distances, 0)
+    sample_labels = labels[rows]
+    # The silhouette needs between 2 and n - 1 distinct labels
+    if not 2 <= len(np.unique(sample_labels)) < len(rows):
+        return np.nan
+    return silhouette_score(distances, sample_labels, metric='precomputed')
+
+
+def _failed_run(n_clusters, init):
+    return {
+        'k': n_clusters, 'init': init, 'cost': np.nan, 'iterations': np.nan, 'fit_seconds': np.nan,
+        'silhouette': np.nan,
+    }
+
+
+def _sweep_run(df, data_version, n_clusters, init, random_state):
+    try:
+        result = fit_kprototypes(df, data_version, n_clusters=n_clusters, init=init, random_state=random_state)
+    except ValueError:
+        # Could not initialise this many clusters; the sweep records it as a gap
+        return _failed_run(n_clusters, init)
+    return {
+        'k': n_clusters,
+        'init': init,
+        'cost': result.cost,
+        'iterations': result.n_iter,
+        'fit_seconds': result.fit_seconds,
+        'silhouette': mixed_silhouette(df, result.labels, result.model.gamma),
+    }
+
+
+def sweep_kprototypes(df, data_version, k_values=SWEEP_K_VALUES, inits=SWEEP_INITS, random_state=42, n_jobs=-1):
+    """Fit every (k, init) combination in parallel and tabulate cost, iterations and time.
+
+    A combination that cannot be fitted on ``df`` gets NaN statistics.
+
+    Runs in joblib's loky process pool, which (unlike a plain ``spawn`` pool)
+    does not re-execute the Streamlit script in each worker. Runs that already
+    have a persisted fit return straight away with their original fit time.
+    """
+    from joblib import Parallel, delayed
+
+    fittable = cluster_options(df, k_values)
+    # The runs happen in worker processes, so the sweep is recorded as one operation
+    with span('cluster_sweep', f"k={min(k_values)}..{max(k_values)}"):
+        rows = Parallel(n_jobs=n_jobs, backend='loky')(
+            delayed(_sweep_run)(df, data_version, k, init, random_state) for k in fittable for init in inits
+        )
+    rows += [_failed_run(k, init) for k in k_values if k not in fittable for init in inits]
+    return pd.DataFrame(rows).sort_values(['init', 'k'], ignore_index=True)
+
+
+def suggest_k(sweep):
+    """Return the elbow ``k`` (per the lowest-cost init) and the best-silhouette ``k``.
+
+    The elbow is the point of the cost curve farthest from the straight line
+    joining its first and last points. Runs that failed (NaN cost) are left
+    out; ``(None, None)`` when none succeeded.
+    """
+    fitted = sweep.dropna(subset=['cost'])
+    if fitted.empty:
+        return None, None
+    best_init = fitted.groupby('init')['cost'].min().idxmin()
+    curve = fitted[fitted['init'] == best_init].sort_values('k')
+    k = curve['k'].to_numpy(dtype=float)
+    cost = curve['cost'].to_numpy(dtype=float)
+    k_norm = (k - k[0]) / (k[-1] - k[0]) if k[-1] != k[0] else np.zeros_like(k)
+    cost_norm = (cost - cost[-1]) / (cost[0] - cost[-1]) if cost[0] != cost[-1] else np.zeros_like(cost)
+    # Distance of each point from the chord between (0, 1) and (1, 0)
+    elbow_k = int(k[np.argmax(np.abs(k_norm + cost_norm - 1))])
+    silhouette = sweep.dropna(subset=['silhouette'])
+    silhouette_k = int(silhouette.loc[silhouette['silhouette'].idxmax(), 'k']) if len(silhouette) else elbow_k
+    return elbow_k, silhouette_k
@@ -0,0 +1,290 @@
+"""State shared by the dashboard's section pages.
+
+Only Streamlit is imported at module level. The data stack is imported by the
+functions that need it, so the login screen and the text-only sections never
+load pandas, matplotlib or kmodes.
+"""
+import os
+
+import streamlit as st
+
+# Set DASHBOARD_WARMUP=0 to render charts only on demand, e.g. when benchmarking
+WARMUP_ENABLED = os.environ.get('DASHBOARD_WARMUP', '1') != '0'
+# Larger case tables get the sampled clustering fit at warm-up, not the full one
+WARMUP_FULL_FIT_MAX_ROWS = int(os.environ.get('DASHBOARD_WARMUP_FULL_FIT_MAX_ROWS', 20_000))
+
+# Sampled cases drawn over the binned cluster pair plot
+OVERLAY_POINTS = 600
+
+# (script, title) of each section page, in navigation order; the first is the default
+SECTIONS = [
+    ('sections/home.py', "Home"),
+    ('sections/dataset_overview.py', "Dataset Overview"),
+    ('sections/visualizations.py', "Visualizations"),
+    ('sections/clustering_results.py', "Clustering Results"),
+    ('sections/insights.py', "Insights"),
+    ('sections/disclaimer.py', "Disclaimer"),
+]
+
+# Admin-only pages, shown to IC numbers listed in DASHBOARD_ADMINS (comma-separated)
+ADMIN_SECTIONS = [
+    ('sections/performance.py', "Performance"),
+]
+ADMIN_IC_NUMBERS = {ic.strip() for ic in os.environ.get('DASHBOARD_ADMINS', '').split(',') if ic.strip()}
+
+# Session-state keys of the sidebar filter widgets
+FILTER_WIDGETS = {
+    'LOCATION (STATE)': 'filter_state',
+    'SOCIAL MEDIA PLATFORM': 'filter_platform',
+    'EDUCATION LEVEL': 'filter_education',
+    'TYPE OF HARASSMENT': 'filter_type',
+}
+YEARS_STATE = 'filter_years'
+
+
+# One store per bundled file version; ingested batches are appended to it in place
+@st.cache_resource
+def get_store(base_version):
+    from data_loader import DATA_PATH
+    from store import CaseStore
+    return CaseStore(DATA_PATH)
+
+
+def current_store():
+    """The shared case store, with batches ingested by other sessions picked up."""
+    from data_loader import DATA_PATH, dataset_version
+    store = get_store(dataset_version(DATA_PATH))
+    store.refresh()
+    return store
+
+
+@st.cache_resource
+def get_figure_cache():
+    from figure_cache import FigureCache
+    from shared_cache import shared_cache
+    return FigureCache(shared=shared_cache())
+
+
+# One fit per dataset version, shared by every session and persisted to disk
+@st.cache_resource
+def load_clusters(_df, data_version, n_clusters=3, init='Cao'):
+    from clustering import fit_kprototypes
+    return fit_kprototypes(_df, data_version, n_clusters=n_clusters, init=init)
+
+
+@st.cache_resource
+def load_sampled_clusters(_df, data_version, sample_size, n_clusters=3, init='Cao'):
+    from clustering import fit_kprototypes_sampled
+    return fit_kprototypes_sampled(_df, data_version, sample_size, n_clusters=n_clusters, init=init)
+
+
+# The sweep persists every fit it makes, so picking k afterwards is a cache hit
+@st.cache_resource
+def load_k_sweep(_df, data_version):
+    from clustering import sweep_kprototypes
+    return sweep_kprototypes(_df, data_version)
+
+
+# Computed once per dataset version, in this process and in the shared cache
+@st.cache_resource
+def load_insights(_cube, data_version):
+    from insights_engine import compute_insights
+    from shared_cache import shared_cache
+    return shared_cache().get_or_compute(('insights', data_version), lambda: compute_insights(_cube))
+
+
+def _rendered(render, run):
+    # ``run(render)`` draws elsewhere, e.g. WarmUp.compute in a worker process
+    return render if run is None else lambda: run(render)
+
+
+def chart_image(name, cube, view_version, theme, run=None):
+    """PNG of a Visualizations chart, from the shared figure cache."""
+    from charts import CHART_SPECS, draw_chart
+    from figure_cache import render_figure
+
+    spec = CHART_SPECS[name]
+    return get_figure_cache().get_or_render(
+        (name, view_version, theme, 'png'),
+        _rendered(lambda: render_figure(draw_chart, spec, cube, figsize=spec.figsize, theme=theme), run)
+    )
+
+
+def cluster_sizes_image(result, theme, run=None):
+    import numpy as np
+    import pandas as pd
+
+    from charts import cluster_sizes
+    from figure_cache import render_figure
+
+    sizes = pd.Series(np.bincount(result.labels, minlength=result.n_clusters), name='count')
+    return get_figure_cache().get_or_render(
+        ('cluster sizes', result.key, theme, 'png'),
+        _rendered(lambda: render_figure(cluster_sizes, sizes, theme=theme), run)
+    )
+
+
+def cluster_pairplot_image(result, clustered, overlay, theme, run=None):
+    import numpy as np
+
+    from aggregates import joint_counts
+    from charts import cluster_pairplot
+    from data_loader import NUMERIC_COLUMNS
+    from figure_cache import render_figure
+
+    def draw():
+        counts, clusters, centres = joint_counts(clustered, 'Cluster', NUMERIC_COLUMNS)
+        sample = None
+        if overlay:
+            rows = np.random.default_rng(0).choice(len(clustered), size=min(OVERLAY_POINTS, len(clustered)), replace=False)
+            sample = clustered.iloc[rows]
+        return render_figure(
+            cluster_pairplot, counts, clusters, centres, NUMERIC_COLUMNS, sample,
+            figsize=(12, 10), nrows=3, ncols=3, theme=theme
+        )
+
+    return get_figure_cache().get_or_render(
+        ('cluster pairplot', result.key, overlay, theme, 'png'), _rendered(draw, run)
+    )
+
+
+def export_button(cube, view_df, view_version, filter_key, theme, clusters=None):
+    """Download button for the view's ZIP export; the archive is built only when clicked.
+
+    Without ``clusters``, the export includes the default clustering of the
+    view: the full fit if one is already cached, else the sampled fit, whose
+    cost is bounded by the sample size. A full fit of a large view would take
+    minutes inside the download.
+    """
+    def build():
+        from clustering import cached_fit, cluster_options, default_sample_size
+        from export import archive_bytes
+
+        result = clusters
+        if result is None and 3 in cluster_options(view_df):
+            result = cached_fit(view_version)
+            if result is None:
+                try:
+                    # Same arguments as Clustering Results, so a fit made there is reused
+                    result = load_sampled_clusters(
+                        view_df, view_version, default_sample_size(len(view_df)), 3, 'Cao'
+                    )
+                except ValueError:
+                    # Too few distinct cases to cluster; export the charts alone
+                    pass
+        return archive_bytes(
+            cube, lambda name: chart_image(name, cube, view_version, theme), result, view_df,
+            {'data_version': view_version, 'filters': {col: list(values) for col, values in filter_key}}
+        )
+
+    st.download_button(
+        "Download tables, charts and clusters (ZIP)", build, file_name=f"harassment-dashboard-{view_version}.zip",
+        mime='application/zip', on_click='ignore'
+    )
+
+
+def _warm(warmup, theme):
+    """Warm-up plan: every chart of the unfiltered view, the insights, then the default clustering.
+
+    The jobs run on the warm-up's threads, which draw and fit in its worker processes.
+    """
+    from charts import CHART_SPECS
+
+    warmup.stage = "Loading cases"
+    store = current_store()
+    cube = store.cube(())
+    version = store.view_version(())
+    warmup.stage = "Pre-rendering charts"
+    for name in CHART_SPECS:
+        warmup.submit(name, chart_image, name, cube, version, theme, warmup.compute)
+    warmup.submit("Insights", load_insights, cube, version)
+    warmup.submit("Clustering", _warm_clusters, warmup, store.frame, version, theme)
+
+
+def _warm_clusters(warmup, df, version, theme):
+    from clustering import default_sample_size, fit_kprototypes, fit_kprototypes_sampled
+    from shared_cache import NullCache, shared_cache
+
+    if isinstance(shared_cache(), NullCache):
+        # The worker's fit could only reach this process by refitting here; the page fits on first open
+        return
+    # The worker persists the fit in the shared cache, where the loaders below find it. Same
+    # arguments as the Clustering Results defaults, so the page hits the same entries.
+    if len(df) <= WARMUP_FULL_FIT_MAX_ROWS:
+        warmup.compute(fit_kprototypes, df, version, n_clusters=3, init='Cao')
+        result = load_clusters(df, version, 3, 'Cao')
+    else:
+        sample_size = default_sample_size(len(df))
+        warmup.compute(fit_kprototypes_sampled, df, version, sample_size, n_clusters=3, init='Cao')
+        result = load_sampled_clusters(df, version, sample_size, 3, 'Cao')
+    cluster_sizes_image(result, theme, warmup.compute)
+    cluster_pairplot_image(result, result.assign(df), False, theme, warmup.compute)
+
+
+# One warm-up per process and theme, started by the first signed-in session
+@st.cache_resource
+def start_warmup(theme):
+    from warmup import WarmUp
+    return WarmUp().start(_warm, theme)
+
+
+@st.fragment(run_every=1)
+def warmup_status(warmup):
+    """Progress of the background warm-up; reruns the app once it is done."""
+    if warmup.finished:
+        st.rerun()
+    done = f"{warmup.completed}/{warmup.submitted}" if warmup.submitted else ""
+    st.progress(warmup.progress, text=f"{warmup.stage}... {done}")
+
+
+def current_theme():
+    return st.context.theme.type or 'light'
+
+
+def keep_filters():
+    """Carry the filter selections across sections that do not draw the filters.
+
+    Streamlit drops a widget's state when a run does not render it.
+    Re-assigning the state turns it into plain session state, so the
+    selection survives a visit to Home or Insights.
+    """
+    for key in FILTER_WIDGETS.values():
+        if key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+
+
+def filtered_view(store):
+    """Draw the sidebar cross-filters; return the filter key, view version and view."""
+    from filters import selection_key
+
+    index = store.index
+    st.sidebar.title("Filters")
+    st.sidebar.caption("Applied to Visualizations and Clustering Results.")
+    selection = {
+        'LOCATION (STATE)': st.sidebar.multiselect(
+            "State", index.values('LOCATION (STATE)'), key=FILTER_WIDGETS['LOCATION (STATE)']
+        ),
+        'SOCIAL MEDIA PLATFORM': st.sidebar.multiselect(
+            "Social media platform", index.values('SOCIAL MEDIA PLATFORM'), key=FILTER_WIDGETS['SOCIAL MEDIA PLATFORM']
+        ),
+        'EDUCATION LEVEL': st.sidebar.multiselect(
+            "Education level", index.values('EDUCATION LEVEL'), key=FILTER_WIDGETS['EDUCATION LEVEL']
+        ),
+        'TYPE OF HARASSMENT': st.sidebar.multiselect(
+            "Type of harassment", index.values('TYPE OF HARASSMENT'), key=FILTER_WIDGETS['TYPE OF HARASSMENT']
+        ),
+    }
+    years = index.values('INCIDENT YEAR')
+    if len(years) > 1:
+        # A range slider takes its mode from ``value``, so the kept range is plain
+        # session state passed back in rather than a widget key
+        kept = st.session_state.get(YEARS_STATE)
+        if kept is None or kept[0] not in years or kept[1] not in years:
+            kept = (years[0], years[-1])
+        first_year, last_year = st.sidebar.select_slider("Incident year", options=years, value=kept)
+        st.session_state[YEARS_STATE] = (first_year, last_year)
+        if (first_year, last_year) != (years[0], years[-1]):
+            selection['INCIDENT YEAR'] = [year for year in years if first_year <= year <= last_year]
+    filter_key = selection_key(selection)
+    # Views untouched by newly ingested batches keep their version and cached results
+    return filter_key, store.view_version(filter_key), store.view(filter_key)
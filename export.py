@@ -0,0 +1,109 @@
+"""Bulk export of a view's chart tables, chart images and clusters as one ZIP.
+
+The archive is written in a single pass, one entry at a time, through
+``zipfile``'s streaming writer:
+
+- every chart's table, read from the aggregate cube, as CSV and Parquet
+- every chart image
+- the cluster assignments and centroids, when a clustering result is given
+- a ``manifest.json`` naming the dataset version, filters and fit
+
+Each entry is encoded straight into its compressed stream, so building an
+entry never needs an uncompressed copy of the others.
+
+The dashboard builds the archive only when the download button is clicked.
+Streamlit's download button serves whole files, so the archive is written
+into an in-memory buffer and handed over as bytes: the compressed archive
+is held in memory once per download. Run ``python export.py dashboard.zip``
+to write the unfiltered view's archive straight to disk instead.
+"""
+import io
+import json
+import re
+import sys
+import time
+import zipfile
+
+import pandas as pd
+
+from charts import CHART_SPECS, chart_table
+
+# Rows per chunk when writing the cluster assignments
+CSV_CHUNK_ROWS = 50_000
+
+
+def slug(name):
+    """File-name form of a chart name."""
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+def table_frame(table):
+    """A chart table as a flat frame: index as columns, string column names."""
+    if isinstance(table, list):
+        # Box-plot statistics: one row per box, outliers as a space-separated list
+        frame = pd.DataFrame(table)
+        frame['fliers'] = [' '.join(f"{value:g}" for value in fliers) for fliers in frame['fliers']]
+        return frame
+    frame = table.to_frame() if isinstance(table, pd.Series) else table
+    frame = frame.reset_index()
+    frame.columns = [str(col) for col in frame.columns]
+    return frame
+
+
+def _write_frame(archive, name, frame):
+    with archive.open(f"{name}.csv", 'w') as entry, io.TextIOWrapper(entry, encoding='utf-8', newline='') as text:
+        frame.to_csv(text, index=False, chunksize=CSV_CHUNK_ROWS)
+    with archive.open(f"{name}.parquet", 'w') as entry:
+        frame.to_parquet(entry, index=False)
+
+
+def write_archive(target, cube, render_chart, clusters=None, view=None, manifest=None):
+    """Write the export ZIP to ``target``, a path or writable binary file.
+
+    ``render_chart(name)`` returns a chart's PNG bytes. ``clusters`` is a
+    ``ClusterResult`` fitted on ``view``. ``manifest`` adds entries to
+    ``manifest.json``.
+    """
+    manifest = {'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'), 'cases': cube.n_rows, **(manifest or {})}
+    with zipfile.ZipFile(target, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        charts = {}
+        for name, spec in CHART_SPECS.items():
+            _write_frame(archive, f"tables/{slug(name)}", table_frame(chart_table(spec, cube)))
+            # PNGs are already compressed
+            archive.writestr(f"charts/{slug(name)}.png", render_chart(name), compress_type=zipfile.ZIP_STORED)
+            charts[slug(name)] = name
+        manifest['charts'] = charts
+        if clusters is not None:
+            _write_frame(archive, 'clusters/assignments', clusters.assign(view))
+            _write_frame(archive, 'clusters/centroids', clusters.centroids.reset_index())
+            manifest['clusters'] = {'key': clusters.key, 'k': clusters.n_clusters, 'cost': float(clusters.cost)}
+        archive.writestr('manifest.json', json.dumps(manifest, indent=2, default=str))
+
+
+def archive_bytes(*args, **kwargs):
+    """``write_archive`` into memory; return the finished archive's bytes."""
+    archive = io.BytesIO()
+    write_archive(archive, *args, **kwargs)
+    return archive.getvalue()
+
+
+if __name__ == '__main__':
+    from charts import draw_chart
+    from clustering import fit_kprototypes
+    from figure_cache import render_figure
+    from store import CaseStore
+
+    if len(sys.argv) != 2:
+        sys.exit("usage: python export.py ARCHIVE.zip")
+    store = CaseStore()
+    cube = store.cube(())
+
+    def render_chart(name):
+        spec = CHART_SPECS[name]
+        return render_figure(draw_chart, spec, cube, figsize=spec.figsize)
+
+    write_archive(
+        sys.argv[1], cube, render_chart, fit_kprototypes(store.frame, store.data_version), store.frame,
+        {'data_version': store.data_version, 'filters': {}}
+    )
+    print(f"wrote {sys.argv[1]}")
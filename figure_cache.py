@@ -0,0 +1,173 @@
+"""Rendered-figure cache shared by every dashboard session.
+
+Charts are drawn onto an explicit ``matplotlib.figure.Figure`` (never the
+pyplot global figure), saved to PNG/SVG bytes and released. ``new_figure``
+owns that lifecycle. A process holds at most ``MAX_LIVE_FIGURES`` figures
+open at once, across all its sessions; further renders wait for a slot
+rather than adding to memory. The warm-up draws in its own worker
+processes, one figure per worker at a time. ``bench.py --soak`` checks that
+memory plateaus over thousands of renders.
+
+The bytes are kept in an LRU cache keyed by chart name, dataset version,
+theme and format. The cache is bounded by total byte size, not entry
+count.
+
+Given a ``shared`` cache (see ``shared_cache``), it checks that cache on a
+local miss and writes every render to it. Figures rendered by another
+replica are then served without drawing them again.
+"""
+import io
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from matplotlib.figure import Figure
+
+from instrumentation import span
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+MAX_LIVE_FIGURES = int(os.environ.get('DASHBOARD_MAX_LIVE_FIGURES', 4))
+
+# Streamlit's dark theme background and text colours
+DARK_BACKGROUND = '#0e1117'
+DARK_FOREGROUND = '#fafafa'
+
+
+def _apply_theme(fig, theme):
+    if theme != 'dark':
+        return
+    fig.patch.set_facecolor(DARK_BACKGROUND)
+    for ax in fig.axes:
+        ax.set_facecolor(DARK_BACKGROUND)
+        for text in [ax.title, ax.xaxis.label, ax.yaxis.label, *ax.get_xticklabels(), *ax.get_yticklabels()]:
+            text.set_color(DARK_FOREGROUND)
+        ax.tick_params(colors=DARK_FOREGROUND)
+        for spine in ax.spines.values():
+            spine.set_edgecolor(DARK_FOREGROUND)
+    for legend in [*fig.legends, *(ax.get_legend() for ax in fig.axes)]:
+        if legend is not None:
+            legend.get_frame().set_facecolor(DARK_BACKGROUND)
+            for text in [legend.get_title(), *legend.get_texts()]:
+                text.set_color(DARK_FOREGROUND)
+
+
+class FigureBudget:
+    """Process-wide cap on the figures held open at once."""
+
+    def __init__(self, limit=MAX_LIVE_FIGURES):
+        self.limit = limit
+        self._slots = threading.BoundedSemaphore(limit)
+        self._live = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self):
+        with self._slots:
+            with self._lock:
+                self._live += 1
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self._live -= 1
+
+    def live(self):
+        """Figures open now in this process."""
+        with self._lock:
+            return self._live
+
+
+FIGURE_BUDGET = FigureBudget()
+
+
+@contextmanager
+def new_figure(figsize=(8, 6), nrows=1, ncols=1):
+    """A figure outside pyplot and its axes, cleared on exit.
+
+    Waits while the process already has its budget of figures open. With ``nrows``/``ncols`` above one, the axes are a 2-D array.
+    """
+    with FIGURE_BUDGET.slot():
+        fig = Figure(figsize=figsize)
+        try:
+            yield fig, fig.add_subplot() if nrows == ncols == 1 else fig.subplots(nrows, ncols, squeeze=False)
+        finally:
+            fig.clear()
+
+
+def render_figure(draw, *args, figsize=(8, 6), fmt='png', theme='light', dpi=100, nrows=1, ncols=1):
+    """Call ``draw(ax, *args)`` on a fresh figure and return the encoded image bytes."""
+    with new_figure(figsize, nrows, ncols) as (fig, ax):
+        draw(ax, *args)
+        _apply_theme(fig, theme)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches='tight', facecolor=fig.get_facecolor())
+        return buffer.getvalue()
+
+
+class FigureCache:
+    """Thread-safe LRU mapping of render keys to image bytes, bounded by size."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, shared=None):
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+        data = None if self.shared is None else self.shared.get(('figure', *key))
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._store(key, data)
+        return data
+
+    def put(self, key, data):
+        self._store(key, data)
+        if self.shared is not None:
+            self.shared.put(('figure', *key), data)
+
+    def _store(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= len(old)
+            self._entries[key] = data
+            self.current_bytes += len(data)
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def get_or_render(self, key, render):
+        """Return cached bytes for ``key``, calling ``render()`` on a miss."""
+        with span('render', str(key[0])) as current:
+            data = self.get(key)
+            current.cache = 'miss' if data is None else 'hit'
+            if data is None:
+                data = render()
+                self.put(key, data)
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
@@ -0,0 +1,88 @@
+"""Cross-filtering over the cached frame with per-category row bitmaps.
+
+For every filterable column, the index keeps one packed bitmap (one bit per
+row) per value. A filter selection is answered with bitwise operations on
+those bitmaps: OR within a column, AND across columns. This avoids building
+boolean masks over the frame's columns on every rerun.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+FILTER_COLUMNS = ['LOCATION (STATE)', 'SOCIAL MEDIA PLATFORM', 'INCIDENT YEAR', 'EDUCATION LEVEL', 'TYPE OF HARASSMENT']
+
+
+class BitmapIndex:
+    """Packed row bitmaps per (column, value), built once per dataset version."""
+
+    def __init__(self, bitmaps, n_rows):
+        self.bitmaps = bitmaps
+        self.n_rows = n_rows
+
+    @classmethod
+    def from_frame(cls, df, columns=FILTER_COLUMNS):
+        bitmaps = {}
+        for col in columns:
+            codes, labels = pd.factorize(df[col], sort=True)
+            # Group row positions by value once, then set each value's bits
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+            bitmaps[col] = {}
+            for code, label in enumerate(labels.tolist()):
+                mask = np.zeros(len(df), dtype=bool)
+                mask[order[bounds[code]:bounds[code + 1]]] = True
+                bitmaps[col][label] = np.packbits(mask)
+        return cls(bitmaps, len(df))
+
+    def extend(self, batch):
+        """Index over the indexed rows followed by the rows of ``batch``.
+
+        Only the batch's columns are scanned; existing bitmaps are widened,
+        and values first seen in the batch get a bitmap that is empty for the
+        older rows.
+        """
+        n_rows = self.n_rows + len(batch)
+        bitmaps = {}
+        for col, col_bitmaps in self.bitmaps.items():
+            codes, labels = pd.factorize(batch[col], sort=True)
+            new_rows = {label: codes == code for code, label in enumerate(labels.tolist())}
+            bitmaps[col] = {}
+            for label in sorted(set(col_bitmaps) | set(new_rows)):
+                old = col_bitmaps.get(label)
+                old = np.zeros(self.n_rows, dtype=bool) if old is None else np.unpackbits(old, count=self.n_rows).astype(bool)
+                added = new_rows.get(label, np.zeros(len(batch), dtype=bool))
+                bitmaps[col][label] = np.packbits(np.concatenate([old, added]))
+        return BitmapIndex(bitmaps, n_rows)
+
+    def values(self, col):
+        """Filterable values of ``col``, in sorted order."""
+        return list(self.bitmaps[col])
+
+    def select(self, selection):
+        """Row positions matching ``selection``, or ``None`` when nothing is filtered.
+
+        ``selection`` maps a column to the values to keep; an empty or missing
+        entry leaves that column unfiltered.
+        """
+        bits = None
+        for col, values in selection.items():
+            if not values:
+                continue
+            col_bits = np.bitwise_or.reduce([self.bitmaps[col][value] for value in values])
+            bits = col_bits if bits is None else bits & col_bits
+        if bits is None:
+            return None
+        return np.flatnonzero(np.unpackbits(bits, count=self.n_rows))
+
+
+def selection_key(selection):
+    """Hashable, order-independent form of a filter selection (empty when unfiltered)."""
+    return tuple((col, tuple(sorted(values))) for col, values in sorted(selection.items()) if values)
+
+
+def filtered_version(data_version, key):
+    """Version string for caches derived from a filtered view of the dataset."""
+    if not key:
+        return data_version
+    return f"{data_version}-{hashlib.sha256(repr(key).encode()).hexdigest()[:8]}"
@@ -0,0 +1,151 @@
+"""Findings for the Insights section, computed from the aggregate cube.
+
+Every input is a count table that the cube already holds from its single
+pass over the cases, so the engine never reads the rows. It computes:
+
+- ``associations``: a chi-square independence test for every pair of
+  categorical columns (incident year included), with Cramér's V as the
+  effect size. The p-values are adjusted with Benjamini-Hochberg across all
+  the pairs tested.
+- ``trends``: the year-over-year change in cases for each type of
+  harassment, plus a least-squares slope over all the years.
+- ``rankings``: states and platforms ranked by the share of their cases
+  that were resolved (user banned or warning issued).
+
+The result depends only on the dataset version. The dashboard computes it
+once per version and caches it.
+"""
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2_contingency, false_discovery_control
+
+from data_loader import CATEGORICAL_COLUMNS
+from instrumentation import span
+
+ASSOCIATION_COLUMNS = CATEGORICAL_COLUMNS + ['INCIDENT YEAR']
+YEAR_COLUMN = 'INCIDENT YEAR'
+TREND_COLUMN = 'TYPE OF HARASSMENT'
+RANKING_COLUMNS = ['LOCATION (STATE)', 'SOCIAL MEDIA PLATFORM']
+OUTCOME_COLUMN = 'OUTCOME/RESULTS'
+RESOLVED_OUTCOMES = ['User banned', 'Warning issued']
+ONGOING_OUTCOME = 'still continues'
+SIGNIFICANCE = 0.05
+
+
+def associations(cube, columns=ASSOCIATION_COLUMNS):
+    """Chi-square test and Cramér's V for every column pair, strongest first."""
+    rows = []
+    for a, b in combinations(columns, 2):
+        table = cube.crosstab(a, b).to_numpy()
+        chi2, p_value, dof, _ = chi2_contingency(table)
+        smaller = min(table.shape) - 1
+        rows.append({
+            'first': a,
+            'second': b,
+            'chi2': chi2,
+            'dof': dof,
+            'p_value': p_value,
+            'cramers_v': np.sqrt(chi2 / (table.sum() * smaller)) if smaller else np.nan,
+        })
+    frame = pd.DataFrame(rows)
+    frame['p_adjusted'] = false_discovery_control(frame['p_value'])
+    frame['significant'] = frame['p_adjusted'] < SIGNIFICANCE
+    return frame.sort_values('cramers_v', ascending=False, ignore_index=True)
+
+
+def trends(cube, column=TREND_COLUMN):
+    """Cases per year for each value of ``column``, with year-over-year deltas and slope.
+
+    Sorted by the latest year's change, largest rise first. With a single
+    year there is no change to report: the cases alone, most first.
+    """
+    table = cube.crosstab(column, YEAR_COLUMN)
+    if len(table.columns) < 2:
+        return pd.DataFrame({f"cases {year}": table[year] for year in table.columns}).sort_values(
+            f"cases {table.columns[0]}", ascending=False
+        )
+    years = table.columns.to_numpy(dtype=float)
+    counts = table.to_numpy(dtype=float)
+    deltas = pd.DataFrame(
+        counts[:, 1:] - counts[:, :-1], index=table.index,
+        columns=[f"{current} vs {previous}" for previous, current in zip(table.columns[:-1], table.columns[1:])]
+    )
+    centred = years - years.mean()
+    frame = pd.DataFrame({f"cases {year}": table[year] for year in table.columns}).join(deltas)
+    frame['latest_change_pct'] = deltas.iloc[:, -1] / table.iloc[:, -2].replace(0, np.nan)
+    # Least-squares slope of every row at once: cov(year, cases) / var(year)
+    frame['slope_per_year'] = (counts - counts.mean(axis=1, keepdims=True)) @ centred / (centred ** 2).sum()
+    return frame.sort_values(deltas.columns[-1], ascending=False)
+
+
+def rankings(cube, columns=RANKING_COLUMNS, outcome=OUTCOME_COLUMN, resolved=RESOLVED_OUTCOMES):
+    """Per ranking column, its values ranked by resolved-case rate."""
+    ranked = {}
+    for col in columns:
+        table = cube.crosstab(col, outcome)
+        cases = table.sum(axis=1)
+        frame = pd.DataFrame({
+            'cases': cases,
+            'share_of_cases': cases / cases.sum(),
+            'resolved_rate': table[[value for value in resolved if value in table.columns]].sum(axis=1) / cases,
+            'ongoing_rate': (table[ONGOING_OUTCOME] if ONGOING_OUTCOME in table.columns else 0) / cases,
+        })
+        frame.insert(0, 'rank', frame['resolved_rate'].rank(ascending=False, method='min').astype(int))
+        ranked[col] = frame.sort_values(['rank', 'cases'], ascending=[True, False])
+    return ranked
+
+
+class Insights:
+    """Computed findings for one dataset version."""
+
+    def __init__(self, associations, trends, rankings, n_cases, years):
+        self.associations = associations
+        self.trends = trends
+        self.rankings = rankings
+        self.n_cases = n_cases
+        self.years = years
+
+    def findings(self):
+        """The headline findings, as short sentences."""
+        period = f"from {self.years[0]} to {self.years[-1]}" if len(self.years) > 1 else f"in {self.years[0]}"
+        lines = [f"{self.n_cases} reported cases {period}."]
+
+        significant = self.associations[self.associations['significant']]
+        for row in significant.head(3).itertuples():
+            lines.append(
+                f"{row.first} and {row.second} are associated (chi-square {row.chi2:.1f}, "
+                f"adjusted p = {row.p_adjusted:.3g}, Cramér's V = {row.cramers_v:.2f})."
+            )
+        if significant.empty:
+            strongest = self.associations.iloc[0]
+            lines.append(
+                f"None of the {len(self.associations)} column pairs tested is significantly associated after "
+                f"adjusting for multiple comparisons; the strongest is {strongest['first']} and "
+                f"{strongest['second']} (Cramér's V = {strongest['cramers_v']:.2f}, "
+                f"adjusted p = {strongest['p_adjusted']:.2f})."
+            )
+
+        if len(self.years) > 1:
+            latest = f"{self.years[-1]} vs {self.years[-2]}"
+            rise, fall = self.trends.iloc[0], self.trends.iloc[-1]
+            lines.append(
+                f"{latest}: the largest rise is {rise.name} ({rise[latest]:+.0f} cases) and the largest fall is "
+                f"{fall.name} ({fall[latest]:+.0f} cases)."
+            )
+
+        for col, ranked in self.rankings.items():
+            best, worst = ranked.iloc[0], ranked.iloc[-1]
+            lines.append(
+                f"By {col.lower()}, {best.name} has the highest resolved rate ({best['resolved_rate']:.0%}) "
+                f"and {worst.name} the lowest ({worst['resolved_rate']:.0%})."
+            )
+        return lines
+
+
+def compute_insights(cube):
+    """All the Insights-section findings for the cube's dataset."""
+    with span('insights', 'compute'):
+        years = cube.counts(YEAR_COLUMN).index.tolist()
+        return Insights(associations(cube), trends(cube), rankings(cube), cube.n_rows, years)
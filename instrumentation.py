@@ -0,0 +1,148 @@
+"""Timing of the dashboard's hot paths.
+
+``span`` wraps one operation (data load, aggregation, chart render,
+clustering fit) and records its wall time, CPU time, resident-memory delta,
+cache outcome and user session. Records go to the process-wide ``RECORDER``,
+which keeps:
+
+- the most recent records, for the Performance page
+- cumulative per-operation totals, for the Prometheus export
+
+Set ``DASHBOARD_METRICS_JSONL`` to also append every record to a JSON-lines
+file.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+MAX_RECORDS = 5000
+METRICS_JSONL = os.environ.get('DASHBOARD_METRICS_JSONL')
+
+# Work done outside a session's script run (e.g. the warm-up pool) is labelled 'background'
+_session = ContextVar('dashboard_session', default='background')
+
+
+def set_session(session_id):
+    """Label the operations of the current script run with ``session_id``."""
+    _session.set(session_id)
+
+
+def current_session():
+    return _session.get()
+
+
+def rss_bytes():
+    """Resident memory of this process; Linux only, else ``None``."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+class Span:
+    """An operation in progress; set ``cache`` to 'hit' or 'miss' when it applies."""
+
+    __slots__ = ('op', 'name', 'cache')
+
+    def __init__(self, op, name, cache):
+        self.op = op
+        self.name = name
+        self.cache = cache
+
+
+class Recorder:
+    """Thread-safe store of recent operation records and cumulative totals."""
+
+    def __init__(self, max_records=MAX_RECORDS, jsonl_path=METRICS_JSONL):
+        self.records = deque(maxlen=max_records)
+        # (op, name) -> [count, wall seconds, cpu seconds, cache hits, cache misses]
+        self.totals = {}
+        self.jsonl_path = jsonl_path
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self.records.append(record)
+            totals = self.totals.setdefault((record['op'], record['name']), [0, 0.0, 0.0, 0, 0])
+            totals[0] += 1
+            totals[1] += record['seconds']
+            totals[2] += record['cpu_seconds']
+            totals[3] += record['cache'] == 'hit'
+            totals[4] += record['cache'] == 'miss'
+            if self.jsonl_path:
+                with open(self.jsonl_path, 'a') as f:
+                    f.write(json.dumps(record) + '\n')
+
+    def snapshot(self, session=None):
+        """Copy of the recent records, optionally for one session only."""
+        with self._lock:
+            records = list(self.records)
+        return [record for record in records if session is None or record['session'] == session]
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+            self.totals.clear()
+
+    def to_jsonl(self, session=None):
+        return ''.join(json.dumps(record) + '\n' for record in self.snapshot(session))
+
+    def to_prometheus(self):
+        """Cumulative totals in the Prometheus text exposition format."""
+        with self._lock:
+            totals = sorted(self.totals.items())
+        metrics = [
+            ('dashboard_operations_total', 'counter', 'Operations recorded.', 0),
+            ('dashboard_operation_seconds_total', 'counter', 'Wall time spent in operations.', 1),
+            ('dashboard_operation_cpu_seconds_total', 'counter', 'CPU time spent in operations.', 2),
+        ]
+        lines = []
+        for metric, kind, description, column in metrics:
+            lines += [f"# HELP {metric} {description}", f"# TYPE {metric} {kind}"]
+            lines += [f"{metric}{{{_labels(op, name)}}} {values[column]:g}" for (op, name), values in totals]
+        lines += ["# HELP dashboard_cache_requests_total Cache lookups by outcome.",
+                  "# TYPE dashboard_cache_requests_total counter"]
+        for (op, name), values in totals:
+            for result, count in (('hit', values[3]), ('miss', values[4])):
+                if values[3] or values[4]:
+                    lines.append(f"dashboard_cache_requests_total{{{_labels(op, name)},result=\"{result}\"}} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(op, name):
+    return f'op="{_escape(op)}",name="{_escape(name)}"'
+
+
+RECORDER = Recorder()
+
+
+@contextmanager
+def span(op, name='', cache=None):
+    """Record the wall time, CPU time and memory delta of the enclosed block."""
+    current = Span(op, name, cache)
+    rss_before = rss_bytes()
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield current
+    finally:
+        wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+        rss_after = rss_bytes()
+        RECORDER.add({
+            'time': time.time(),
+            'session': _session.get(),
+            'op': current.op,
+            'name': current.name,
+            'seconds': wall,
+            'cpu_seconds': cpu,
+            'rss_delta_bytes': None if rss_before is None else rss_after - rss_before,
+            'cache': current.cache,
+        })
@@ -0,0 +1,209 @@
+"""Optional Arrow query engine for the aggregate cube.
+
+Set ``DASHBOARD_QUERY_ENGINE=arrow`` to build the Visualizations cubes with
+pyarrow's query engine (Acero) over the cases' Parquet files instead of
+pandas over the in-memory frame; pandas stays the default. DuckDB is not a
+dependency, and pyarrow already is, for the Parquet snapshot.
+
+The files are the ones the store already writes: the dataset's Parquet
+snapshot and one Parquet part per ingested batch. Nothing is copied, and a
+batch is counted only if the store names it.
+
+A cube is one scan of those files, reading only the cube columns. The
+sidebar filters are pushed down into the scan as ``isin`` expressions, so
+Parquet row groups whose statistics rule them out are skipped. Each record batch of the
+scan is grouped once per column pair with ``count_all``. The grouped results
+have one row per observed pair of values, bounded by that pair's
+cardinalities. Those results are summed over the batches, and the cube's
+count tables are built straight from them. The per-column totals are the
+margins of the pair tables. The scan holds at most ``SCAN_BATCH_ROWS``
+cases at a time.
+
+This is not a performance feature. ``CaseStore`` still loads the full
+frame and its bitmap index in this mode, for the views, the clustering and
+the version bookkeeping, so it saves no memory. It is also slower than
+pandas: an unfiltered cube takes about 15 ms against 2 ms on the bundled
+data, and 110 ms against 30 ms at 100 times its size. The mode is for
+checking the cubes against an independent implementation, and a starting
+point should the store stop holding every case in memory.
+
+Run ``python query_engine.py`` to check that both engines build identical
+cubes for a set of filtered views.
+"""
+import os
+import sys
+import tempfile
+import time
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from aggregates import CUBE_COLUMNS, AggregateCube
+from data_loader import CATEGORICAL_COLUMNS, COLUMN_DTYPES, NUMERIC_COLUMNS
+from filters import FILTER_COLUMNS
+
+QUERY_ENGINE = os.environ.get('DASHBOARD_QUERY_ENGINE', 'pandas')
+SCAN_BATCH_ROWS = 65_536
+
+
+def _value(column, value):
+    return int(value) if column in NUMERIC_COLUMNS else str(value)
+
+
+def _filter_expression(filter_key):
+    import pyarrow.compute as pc
+
+    expression = None
+    for col, values in filter_key:
+        clause = pc.field(col).isin([_value(col, value) for value in values])
+        expression = clause if expression is None else expression & clause
+    return expression
+
+
+class ArrowEngine:
+    """Cube queries over the dataset snapshot and the ingested batches' Parquet parts."""
+
+    def __init__(self, base_path, batch_dir):
+        self.base_path = Path(base_path)
+        self.batch_dir = Path(batch_dir)
+
+    @classmethod
+    def for_frame(cls, frame, snapshot, batch_dir):
+        """Engine over ``snapshot``, writing it from ``frame`` if it is missing, e.g. for the remote CSV."""
+        engine = cls(snapshot, batch_dir)
+        if not engine.base_path.exists():
+            engine.base_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = engine.base_path.with_suffix(f".{os.getpid()}.tmp")
+            frame.to_parquet(tmp, index=False)
+            os.replace(tmp, engine.base_path)
+        return engine
+
+    def _path(self, batch_id):
+        return self.base_path if batch_id == '' else self.batch_dir / f"{batch_id}.parquet"
+
+    def pair_counts(self, filter_key, batch_ids):
+        """``{(a, b): (values of a, values of b, cases)}`` over the view's rows in ``batch_ids``.
+
+        ``filter_key`` is a ``selection_key``; ``batch_ids`` names the files
+        to scan, ``''`` being the base dataset. Each observed pair of values
+        appears once.
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        expression = _filter_expression(filter_key)
+        parts = {pair: [] for pair in combinations(CUBE_COLUMNS, 2)}
+        for batch_id in batch_ids:
+            scanner = ds.dataset(self._path(batch_id), format='parquet').scanner(
+                columns=CUBE_COLUMNS, filter=expression, batch_size=SCAN_BATCH_ROWS
+            )
+            for batch in scanner.to_batches():
+                if not batch.num_rows:
+                    continue
+                # Plain strings and int64, as the files' dictionary and integer widths can differ
+                table = pa.table({
+                    col: batch.column(col).dictionary_decode() if col in CATEGORICAL_COLUMNS
+                    else batch.column(col).cast(pa.int64())
+                    for col in CUBE_COLUMNS
+                })
+                for a, b in parts:
+                    parts[(a, b)].append(table.group_by([a, b]).aggregate([([], 'count_all')]))
+        counts = {}
+        for (a, b), tables in parts.items():
+            if tables:
+                summed = pa.concat_tables(tables).group_by([a, b]).aggregate([('count_all', 'sum')])
+                columns = (summed.column(a), summed.column(b), summed.column('count_all_sum'))
+                counts[(a, b)] = tuple(column.to_numpy(zero_copy_only=False) for column in columns)
+            else:
+                empty = np.array([], dtype=np.int64)
+                counts[(a, b)] = (empty, empty, empty)
+        return counts
+
+    def cube(self, filter_key, categories, batch_ids):
+        """Aggregate cube of a view; ``categories`` are the frame's category lists per column.
+
+        The categories keep unobserved values in the count tables, as
+        ``AggregateCube.from_frame`` on the filtered frame does. Numeric
+        columns list only their observed values, sorted, as it does too.
+        """
+        counts = self.pair_counts(filter_key, batch_ids)
+        first, second = CUBE_COLUMNS[:2]
+        labels = {col: pd.Index(np.asarray(categories[col]), name=col) for col in CATEGORICAL_COLUMNS}
+        for col in NUMERIC_COLUMNS:
+            observed = counts[(first, col)][1]
+            labels[col] = pd.Index(np.unique(observed).astype(COLUMN_DTYPES[col]), name=col)
+        pairs = {}
+        for (a, b), (values_a, values_b, cases) in counts.items():
+            table = np.zeros((len(labels[a]), len(labels[b])), dtype=np.int64)
+            table[labels[a].get_indexer(values_a), labels[b].get_indexer(values_b)] = cases
+            pairs[(a, b)] = pd.DataFrame(table, index=labels[a], columns=labels[b])
+        # Every case has all the cube columns, so a pair table's margins are the column totals
+        totals = {first: pairs[(first, second)].sum(axis=1)}
+        for col in CUBE_COLUMNS[1:]:
+            totals[col] = pairs[(first, col)].sum(axis=0)
+        # A table without columns sums to floats, e.g. an empty view's numeric columns
+        totals = {col: total.astype(np.int64).rename('count') for col, total in totals.items()}
+        return AggregateCube(totals, pairs, int(totals[first].sum()))
+
+
+def cube_mismatches(expected, actual):
+    """Descriptions of the count tables that differ between two cubes."""
+    problems = [] if expected.n_rows == actual.n_rows else [f"n_rows {expected.n_rows} != {actual.n_rows}"]
+    for col, table in expected.totals.items():
+        if not table.equals(actual.totals[col]) or not table.index.equals(actual.totals[col].index):
+            problems.append(f"totals[{col}]")
+    for key, table in expected.pairs.items():
+        other = actual.pairs[key]
+        if not (table.equals(other) and table.index.equals(other.index) and table.columns.equals(other.columns)):
+            problems.append(f"pairs[{key[0]} x {key[1]}]")
+    return problems
+
+
+def parity_check(store, filter_keys=None):
+    """Compare the pandas and Arrow cubes of ``store`` for each filter key.
+
+    Without ``filter_keys``, checks the unfiltered view, one view per value of
+    every filter column and one two-column view. Returns
+    ``{filter_key: [mismatch, ...]}`` for the views that differ.
+    """
+    from filters import selection_key
+
+    if store.engine is None:
+        # The frame already includes any batches, so it is scanned as one throwaway snapshot
+        with tempfile.TemporaryDirectory() as work_dir:
+            store.engine = ArrowEngine.for_frame(store.frame, Path(work_dir) / 'cases.parquet', work_dir)
+            batches, store.batches = store.batches, []
+            try:
+                return parity_check(store, filter_keys)
+            finally:
+                store.engine, store.batches = None, batches
+    if filter_keys is None:
+        filter_keys = [()]
+        for col in FILTER_COLUMNS:
+            filter_keys += [selection_key({col: [value]}) for value in store.index.values(col)]
+        first = {col: store.index.values(col)[:2] for col in FILTER_COLUMNS[:2]}
+        filter_keys.append(selection_key(first))
+    categories = {col: store.frame[col].cat.categories for col in CATEGORICAL_COLUMNS}
+    batch_ids = ['', *(batch_id for batch_id, _, _ in store.batches)]
+    failures = {}
+    for filter_key in filter_keys:
+        rows = store.index.select(dict(filter_key))
+        expected = AggregateCube.from_frame(store.frame if rows is None else store.frame.iloc[rows])
+        problems = cube_mismatches(expected, store.engine.cube(filter_key, categories, batch_ids))
+        if problems:
+            failures[filter_key] = problems
+    return failures
+
+
+if __name__ == '__main__':
+    from store import CaseStore
+
+    store = CaseStore(engine='arrow')
+    start = time.perf_counter()
+    failures = parity_check(store)
+    print(f"checked pandas vs Arrow cubes in {time.perf_counter() - start:.1f}s, {len(store.frame)} cases")
+    for filter_key, problems in failures.items():
+        print(f"{filter_key or 'unfiltered'}: {', '.join(problems)}")
+    sys.exit(1 if failures else 0)
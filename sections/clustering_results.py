@@ -0,0 +1,87 @@
+import streamlit as st
+
+from charts import k_sweep
+from clustering import SWEEP_INITS, cluster_options, default_sample_size, label_agreement, suggest_k
+from dashboard import (
+    cluster_pairplot_image, cluster_sizes_image, current_store, current_theme, export_button, filtered_view,
+    get_figure_cache, load_clusters, load_k_sweep, load_sampled_clusters
+)
+from figure_cache import render_figure
+
+store = current_store()
+filter_key, view_version, view_df = filtered_view(store)
+theme = current_theme()
+df = store.frame
+
+st.header("Clustering Analysis")
+if filter_key:
+    st.caption(f"Clustering {len(view_df)} of {len(df)} cases matching the sidebar filters.")
+k_options = cluster_options(view_df)
+if not k_options:
+    st.warning("Too few cases match the current filters to cluster.")
+    st.stop()
+
+with st.expander("Choose the number of clusters"):
+    if st.checkbox("Run a k sweep (elbow and silhouette)"):
+        with st.spinner("Fitting K-Prototypes for every k..."):
+            sweep = load_k_sweep(view_df, view_version)
+        elbow_k, silhouette_k = suggest_k(sweep)
+        image = get_figure_cache().get_or_render(
+            ('k sweep', view_version, theme, 'png'),
+            lambda: render_figure(k_sweep, sweep, theme=theme)
+        )
+        st.image(image)
+        if elbow_k is not None:
+            st.write(f"Suggested k: {elbow_k} (elbow), {silhouette_k} (best silhouette).")
+        st.dataframe(sweep)
+
+col1, col2 = st.columns(2)
+n_clusters = col1.select_slider("Number of clusters", options=k_options, value=min(3, k_options[-1]))
+init = col2.selectbox("Initialisation", SWEEP_INITS)
+
+sampled = st.toggle("Sampled mode for large case tables")
+try:
+    if sampled:
+        sample_size = default_sample_size(len(view_df))
+        if len(view_df) > sample_size:
+            sample_size = st.slider(
+                "Sample size (rows)",
+                min_value=sample_size // 2,
+                max_value=len(view_df),
+                value=sample_size,
+                step=max(1, sample_size // 10)
+            )
+        with st.spinner("Fitting K-Prototypes on a stratified sample..."):
+            result = load_sampled_clusters(view_df, view_version, sample_size, n_clusters, init)
+        if st.checkbox("Compare with a full fit"):
+            with st.spinner("Fitting K-Prototypes..."):
+                full_result = load_clusters(view_df, view_version, n_clusters, init)
+            agreement = label_agreement(result.labels, full_result.labels)
+            st.write(
+                f"Sampled fit agrees with the full fit on {agreement['matched_share']:.1%} of rows "
+                f"(adjusted Rand index {agreement['adjusted_rand']:.2f}). "
+                f"Fit time: {result.fit_seconds:.1f}s sampled vs {full_result.fit_seconds:.1f}s full."
+            )
+    else:
+        with st.spinner("Fitting K-Prototypes..."):
+            result = load_clusters(view_df, view_version, n_clusters, init)
+except ValueError:
+    # K-Prototypes could not initialise: too few distinct cases for this many clusters
+    st.warning(f"The cases matching the current filters cannot be split into {n_clusters} clusters; try fewer.")
+    st.stop()
+clustered = result.assign(view_df)
+
+st.write("### Clustering Results")
+st.dataframe(clustered.head())
+st.write("### Cluster Centroids")
+st.dataframe(result.centroids)
+
+st.image(cluster_sizes_image(result, theme))
+
+st.write("### Detailed Analysis")
+overlay = st.checkbox("Overlay a sample of individual cases")
+st.image(cluster_pairplot_image(result, clustered, overlay, theme))
+
+st.write("### Export")
+st.caption("Cluster assignments and centroids of this fit, with every chart's table and image for this view.")
+export_button(store.cube(filter_key), view_df, view_version, filter_key, theme, result)
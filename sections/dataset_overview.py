@@ -0,0 +1,30 @@
+import streamlit as st
+
+from dashboard import current_store
+from data_loader import memory_report
+
+store = current_store()
+df = store.frame
+
+st.header("Dataset Overview")
+st.write("### First Five Rows of the Dataset")
+st.dataframe(df.head())
+st.write("### Summary Statistics")
+st.dataframe(df.describe())
+st.write("### Memory Footprint")
+report = memory_report(df)
+st.write(
+    f"Typed frame: {report['typed_bytes'] / 1024:.1f} KiB vs "
+    f"{report['object_bytes'] / 1024:.1f} KiB with object columns "
+    f"({report['saving']:.0%} smaller)."
+)
+st.write("### Add New Cases")
+st.caption(f"{len(store.batches)} batch(es) ingested on top of the bundled dataset.")
+batch_file = st.file_uploader("CSV batch with the dataset's columns", type="csv")
+if batch_file is not None and st.button("Ingest batch"):
+    try:
+        added = store.ingest(batch_file)
+    except ValueError as exc:
+        st.error(f"Batch rejected: {exc}")
+    else:
+        st.success(f"Appended {added} cases; every section includes them from the next interaction.")
@@ -0,0 +1,18 @@
+import streamlit as st
+
+st.header("Disclaimer")
+st.write("### Important Information")
+st.markdown("""
+**Disclaimer:**
+- This dashboard is for educational and analytical purposes only.  
+- The data is anonymized and does not contain personally identifiable information (PII).  
+- Insights derived here are based on available data and are not intended as legal or professional advice.  
+
+**Ethical Guidelines:**
+- The goal is to raise awareness about online harassment.  
+- Misuse of data or insights is strictly discouraged.  
+
+**Contact:**
+If you have concerns, email us at: [pavethranbatmanathen@gmail.com](mailto:pavethranbatmanathen@gmail.com)
+""")
+st.warning("By using this dashboard, you agree to the terms outlined above.")
@@ -0,0 +1,30 @@
+import streamlit as st
+
+from dashboard import current_store, load_insights
+
+store = current_store()
+insights = load_insights(store.cube(()), store.data_version)
+
+st.header("Insights")
+st.write("### Key Findings and Observations")
+st.markdown('\n'.join(f"- {line}" for line in insights.findings()))
+st.caption("Computed from every case, whatever the sidebar filters; recomputed only when new cases are added.")
+
+st.write("### Associations Between Columns")
+st.caption(
+    "Chi-square test of independence for each pair of columns. Cramér's V measures the strength of the "
+    "association (0 = none, 1 = complete); p-values are adjusted for the number of pairs tested."
+)
+st.dataframe(insights.associations, hide_index=True)
+
+st.write("### Year-over-Year Change by Type of Harassment")
+st.dataframe(insights.trends)
+
+st.write("### Rankings by Resolved Rate")
+st.caption("Resolved: the case ended with the user banned or a warning issued.")
+for column, ranked in insights.rankings.items():
+    st.write(f"#### {column.title()}")
+    st.dataframe(ranked)
+
+st.markdown("---")
+st.markdown("Created by PAVETHRAN BATMANATHEN")
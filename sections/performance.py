@@ -0,0 +1,63 @@
+import pandas as pd
+import streamlit as st
+
+from dashboard import get_figure_cache
+from figure_cache import FIGURE_BUDGET
+from instrumentation import RECORDER
+from shared_cache import shared_cache
+
+st.header("Performance")
+st.caption("Operations recorded since the server started: data loads, aggregations, chart renders and clustering fits.")
+
+figures = get_figure_cache()
+lookups = figures.hits + figures.misses
+col1, col2, col3 = st.columns(3)
+col1.metric("Figure cache hit rate", f"{figures.hits / lookups:.0%}" if lookups else "n/a")
+col2.metric("Cached figures", len(figures))
+col3.metric("Figure cache size", f"{figures.current_bytes / 1024 ** 2:.1f} MiB")
+
+shared = shared_cache()
+usage = shared.usage()
+st.caption(
+    f"Shared {type(shared).__name__}: {sum(entries for entries, _ in usage.values())} entries, "
+    f"{sum(size for _, size in usage.values()) / 1024 ** 2:.1f} of {shared.max_bytes / 1024 ** 2:.0f} MiB "
+    f"({', '.join(f'{namespace} {entries}' for namespace, (entries, _) in sorted(usage.items())) or 'empty'}). "
+    f"{FIGURE_BUDGET.live()} figure(s) being drawn, at most {FIGURE_BUDGET.limit} at once."
+)
+
+session = st.session_state.get('session_id') if st.toggle("This session only") else None
+records = pd.DataFrame(RECORDER.snapshot(session))
+if records.empty:
+    st.info("No operations recorded yet.")
+    st.stop()
+
+records['hit'] = records['cache'].eq('hit')
+records['looked_up'] = records['cache'].notna()
+grouped = records.groupby(['op', 'name'])
+operations = pd.DataFrame({
+    'count': grouped.size(),
+    'total_seconds': grouped['seconds'].sum(),
+    'mean_seconds': grouped['seconds'].mean(),
+    'max_seconds': grouped['seconds'].max(),
+    'cpu_seconds': grouped['cpu_seconds'].sum(),
+    'max_rss_delta_mib': grouped['rss_delta_bytes'].max() / 1024 ** 2,
+    'hit_rate': grouped['hit'].sum() / grouped['looked_up'].sum().replace(0, float('nan')),
+}).sort_values('max_seconds', ascending=False)
+
+st.write("### Slowest Operations")
+st.dataframe(operations.reset_index(), hide_index=True)
+
+st.write("### Cache Hit Rates")
+by_op = records[records['looked_up']].groupby('op')
+st.dataframe(
+    pd.DataFrame({'lookups': by_op.size(), 'hit_rate': by_op['hit'].mean()}).reset_index(),
+    hide_index=True
+)
+
+st.write("### Export")
+col1, col2 = st.columns(2)
+col1.download_button("Prometheus metrics", RECORDER.to_prometheus(), file_name="metrics.prom", mime="text/plain")
+col2.download_button(
+    "Operation log (JSON lines)", RECORDER.to_jsonl(session), file_name="operations.jsonl",
+    mime="application/x-ndjson"
+)
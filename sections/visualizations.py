@@ -0,0 +1,44 @@
+import streamlit as st
+
+from charts import CHART_SPECS
+from dashboard import chart_image, current_store, current_theme, export_button, filtered_view
+
+# Static images are rendered on the server; interactive charts ship only the aggregated table
+RENDERERS = ["Image", "Interactive"]
+
+store = current_store()
+filter_key, view_version, view_df = filtered_view(store)
+theme = current_theme()
+
+st.header("Visualizations")
+if filter_key:
+    st.caption(f"Showing {len(view_df)} of {len(store.frame)} cases matching the sidebar filters.")
+if view_df.empty:
+    st.warning("No cases match the current filters.")
+    st.stop()
+
+graph_options = list(CHART_SPECS)
+
+selected_graph = st.selectbox("Select a graph to view", graph_options)
+cube = store.cube(filter_key)
+
+# The renderer is remembered per chart, so backends can be compared chart by chart
+renderers = st.session_state.setdefault('chart_renderers', {})
+renderer = st.radio(
+    "Renderer",
+    RENDERERS,
+    index=RENDERERS.index(renderers.get(selected_graph, RENDERERS[0])),
+    horizontal=True,
+    key=f"renderer-{selected_graph}"
+)
+renderers[selected_graph] = renderer
+
+if renderer == "Interactive":
+    from vega_charts import vega_chart
+    st.altair_chart(vega_chart(CHART_SPECS[selected_graph], cube), width='stretch')
+else:
+    st.image(chart_image(selected_graph, cube, view_version, theme))
+
+st.write("### Export")
+st.caption("Every chart's table (CSV and Parquet) and image, with cluster assignments and centroids, for this view.")
+export_button(cube, view_df, view_version, filter_key, theme)
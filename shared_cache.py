@@ -0,0 +1,296 @@
+"""Cache shared by every dashboard process on the host.
+
+Streamlit's caches live inside one server process. Replicas behind a load
+balancer would each reload the dataset, refit clustering and re-render every
+chart. This module is a second tier underneath those in-process caches. It
+holds the loaded frame and its index, aggregate cubes, rendered figures and
+cluster models, so work done by one replica is reused by the others.
+
+Keys are tuples whose first element is the namespace (``'frame'``,
+``'cube'``, ``'figure'``, ``'clusters'``). The rest of the key carries the
+dataset or view version, so a new dataset version never reads stale
+entries. Old versions simply age out. Values are pickled.
+
+Two backends are provided:
+
+- ``DiskCache``: one file per entry under a directory.
+- ``SQLiteCache``: one table in a SQLite database in WAL mode.
+
+Both drop entries older than the TTL and evict the least recently used
+entries once the total size passes ``max_bytes``. If two replicas miss the
+same key at the same time, both compute it and the last write wins. The
+results are identical.
+
+Configure the process-wide cache with environment variables:
+
+- ``DASHBOARD_SHARED_CACHE``: ``disk`` (the default), ``sqlite`` or ``off``.
+- ``DASHBOARD_SHARED_CACHE_PATH``: the directory or database file.
+- ``DASHBOARD_SHARED_CACHE_MAX_MB``: the size bound.
+- ``DASHBOARD_SHARED_CACHE_TTL``: the TTL in seconds.
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from data_loader import CACHE_DIR
+from instrumentation import span
+
+BACKEND = os.environ.get('DASHBOARD_SHARED_CACHE', 'disk')
+CACHE_PATH = os.environ.get('DASHBOARD_SHARED_CACHE_PATH')
+MAX_BYTES = int(float(os.environ.get('DASHBOARD_SHARED_CACHE_MAX_MB', 512)) * 1024 ** 2)
+TTL_SECONDS = float(os.environ.get('DASHBOARD_SHARED_CACHE_TTL', 7 * 24 * 3600))
+
+
+def entry_name(key):
+    """Stable file/row name of a cache key."""
+    return hashlib.sha256(repr(key).encode()).hexdigest()[:32]
+
+
+def sqlite_connection(local, path, *setup):
+    """The calling thread's autocommit WAL connection to ``path``, kept in ``local``.
+
+    sqlite3 connections must stay on the thread that opened them. The
+    ``setup`` statements run once on each new connection.
+    """
+    connection = getattr(local, 'connection', None)
+    if connection is None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        for statement in setup:
+            connection.execute(statement)
+        local.connection = connection
+    return connection
+
+
+class SharedCache:
+    """Pickling front end of a backend; subclasses store the raw bytes."""
+
+    def __init__(self, max_bytes=MAX_BYTES, ttl=TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Cached value of ``key``, or ``None``."""
+        namespace = key[0]
+        with span('shared_cache', namespace) as current:
+            try:
+                data = self._read(namespace, entry_name(key))
+                value = None if data is None else pickle.loads(data)
+            except (OSError, sqlite3.Error, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+                value = None
+            current.cache = 'miss' if value is None else 'hit'
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key, value):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return
+        try:
+            self._write(key[0], entry_name(key), data)
+            self.evict()
+        except (OSError, sqlite3.Error):
+            # A full or read-only cache location only costs recomputation
+            pass
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value of ``key``, calling ``compute()`` and storing it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _read(self, namespace, name):
+        raise NotImplementedError
+
+    def _write(self, namespace, name, data):
+        raise NotImplementedError
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under ``max_bytes``."""
+        raise NotImplementedError
+
+    def usage(self):
+        """``{namespace: (entries, bytes)}`` of what is stored now."""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class NullCache(SharedCache):
+    """Stores nothing; used when the shared cache is turned off."""
+
+    def _read(self, namespace, name):
+        return None
+
+    def _write(self, namespace, name, data):
+        pass
+
+    def evict(self):
+        pass
+
+    def usage(self):
+        return {}
+
+    def clear(self):
+        pass
+
+
+class DiskCache(SharedCache):
+    """One pickle file per entry, under ``directory/<namespace>/``.
+
+    A file's modification time is when it was written, for the TTL. Its
+    access time is set on every read, for LRU eviction, so ``noatime``
+    mounts do not matter.
+    """
+
+    def __init__(self, directory, max_bytes=MAX_BYTES, ttl=TTL_SECONDS):
+        super().__init__(max_bytes, ttl)
+        self.directory = Path(directory)
+
+    def _path(self, namespace, name):
+        return self.directory / namespace / f"{name}.pkl"
+
+    def _read(self, namespace, name):
+        path = self._path(namespace, name)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        if time.time() - stat.st_mtime > self.ttl:
+            return None
+        data = path.read_bytes()
+        os.utime(path, (time.time(), stat.st_mtime))
+        return data
+
+    def _write(self, namespace, name, data):
+        path = self._path(namespace, name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _entries(self):
+        entries = []
+        for path in self.directory.glob('*/*.pkl'):
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                pass
+        return entries
+
+    def evict(self):
+        now = time.time()
+        live = []
+        for path, stat in self._entries():
+            if now - stat.st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+            else:
+                live.append((stat.st_atime, stat.st_size, path))
+        total = sum(size for _, size, _ in live)
+        for _, size, path in sorted(live, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def usage(self):
+        usage = {}
+        for path, stat in self._entries():
+            entries, size = usage.get(path.parent.name, (0, 0))
+            usage[path.parent.name] = (entries + 1, size + stat.st_size)
+        return usage
+
+    def clear(self):
+        for path, _ in self._entries():
+            path.unlink(missing_ok=True)
+
+
+class SQLiteCache(SharedCache):
+    """Entries as rows of one SQLite table; WAL mode lets replicas read while one writes."""
+
+    def __init__(self, path, max_bytes=MAX_BYTES, ttl=TTL_SECONDS):
+        super().__init__(max_bytes, ttl)
+        self.path = Path(path)
+        self._local = threading.local()
+
+    def _connection(self):
+        return sqlite_connection(
+            self._local, self.path,
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'name TEXT PRIMARY KEY, namespace TEXT, value BLOB, size INTEGER, created REAL, accessed REAL)',
+            'CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)'
+        )
+
+    def _read(self, namespace, name):
+        connection = self._connection()
+        row = connection.execute(
+            'SELECT value FROM entries WHERE name = ? AND created >= ?', (name, time.time() - self.ttl)
+        ).fetchone()
+        if row is None:
+            return None
+        connection.execute('UPDATE entries SET accessed = ? WHERE name = ?', (time.time(), name))
+        return row[0]
+
+    def _write(self, namespace, name, data):
+        now = time.time()
+        self._connection().execute(
+            'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)', (name, namespace, data, len(data), now, now)
+        )
+
+    def evict(self):
+        connection = self._connection()
+        connection.execute('DELETE FROM entries WHERE created < ?', (time.time() - self.ttl,))
+        total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for name, size in connection.execute('SELECT name, size FROM entries ORDER BY accessed'):
+            if total <= self.max_bytes:
+                break
+            doomed.append((name,))
+            total -= size
+        connection.executemany('DELETE FROM entries WHERE name = ?', doomed)
+
+    def usage(self):
+        rows = self._connection().execute('SELECT namespace, COUNT(*), SUM(size) FROM entries GROUP BY namespace')
+        return {namespace: (entries, size) for namespace, entries, size in rows}
+
+    def clear(self):
+        self._connection().execute('DELETE FROM entries')
+
+
+def open_cache(backend=BACKEND, path=CACHE_PATH, max_bytes=MAX_BYTES, ttl=TTL_SECONDS):
+    """Shared cache for ``backend`` ('disk', 'sqlite' or 'off') at ``path``."""
+    if backend == 'disk':
+        return DiskCache(path or CACHE_DIR / 'shared', max_bytes, ttl)
+    if backend == 'sqlite':
+        return SQLiteCache(path or CACHE_DIR / 'shared.sqlite', max_bytes, ttl)
+    if backend == 'off':
+        return NullCache(max_bytes, ttl)
+    raise ValueError(f"unknown shared cache backend {backend!r}; use 'disk', 'sqlite' or 'off'")
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def shared_cache():
+    """The process-wide shared cache configured by the environment."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = open_cache()
+        return _default
@@ -0,0 +1,293 @@
+"""Append-only case store: the bundled dataset plus ingested batches.
+
+New cases arrive as CSV batches. Each batch is read in chunks, validated
+against the dataset schema and written to ``ingested/`` as one Parquet part,
+so a batch is never re-parsed and the bundled ``data.csv`` is never
+rewritten.
+
+The in-memory state grows by appending. The frame gains the batch rows, and
+the bitmap index is extended rather than rebuilt. Each view's aggregate cube
+is brought up to date by merging the cube of only the new rows that match
+the view.
+
+The typed frame with its bitmap index, and the cube of each view, also go
+through the shared cache (see ``shared_cache``). A replica starting on a
+dataset version another replica has loaded skips the parse and the index
+build.
+
+A view's version names only the batches that actually add rows to it.
+Figures, cubes and cluster fits cached for a filtered view that a batch does
+not touch therefore keep their keys and stay valid.
+
+Run ``python store.py new_cases.csv`` to ingest a batch from the command
+line. A running dashboard picks up the new part on its next rerun.
+"""
+import hashlib
+import os
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from aggregates import AggregateCube
+from data_loader import (
+    BASE_DIR, CATEGORICAL_COLUMNS, COLUMN_DTYPES, DATA_PATH, NUMERIC_COLUMNS, dataset_version, load_dataset,
+    snapshot_path
+)
+from filters import BitmapIndex, filtered_version
+from instrumentation import span
+from shared_cache import shared_cache
+from query_engine import QUERY_ENGINE, ArrowEngine
+
+BATCH_DIR = Path(os.environ.get("DASHBOARD_BATCH_DIR", BASE_DIR / "ingested"))
+CHUNK_ROWS = 10_000
+MAX_CACHED_VIEWS = 32
+
+
+def validate_chunk(chunk, first_row=0):
+    """Check one raw CSV chunk against the schema and return it with dashboard dtypes.
+
+    Raises ``ValueError`` listing every problem found; ``first_row`` offsets
+    the reported row numbers so they point into the whole file.
+    """
+    problems = []
+    missing = [col for col in COLUMN_DTYPES if col not in chunk.columns]
+    unexpected = [col for col in chunk.columns if col not in COLUMN_DTYPES]
+    if missing:
+        problems.append(f"missing columns: {', '.join(missing)}")
+    if unexpected:
+        problems.append(f"unexpected columns: {', '.join(unexpected)}")
+    if problems:
+        raise ValueError('; '.join(problems))
+
+    chunk = chunk[list(COLUMN_DTYPES)]
+    for col in CATEGORICAL_COLUMNS:
+        empty = chunk[col].isna() | (chunk[col].astype(str).str.strip() == '')
+        if empty.any():
+            problems.append(f"{col}: empty values in rows {_row_numbers(empty, first_row)}")
+    for col in NUMERIC_COLUMNS:
+        values = pd.to_numeric(chunk[col], errors='coerce')
+        info = np.iinfo(COLUMN_DTYPES[col])
+        bad = values.isna() | (values % 1 != 0) | (values < info.min) | (values > info.max)
+        if bad.any():
+            problems.append(f"{col}: non-integer or out-of-range values in rows {_row_numbers(bad, first_row)}")
+    if problems:
+        raise ValueError('; '.join(problems))
+
+    chunk = chunk.assign(**{col: chunk[col].astype(str).str.strip() for col in CATEGORICAL_COLUMNS})
+    chunk = chunk.assign(**{col: pd.to_numeric(chunk[col]) for col in NUMERIC_COLUMNS})
+    return chunk.astype(COLUMN_DTYPES).reset_index(drop=True)
+
+
+def _row_numbers(mask, first_row, limit=5):
+    # 1-based data rows, as a spreadsheet would show them below the header
+    rows = (np.flatnonzero(mask.to_numpy()) + first_row + 1).tolist()
+    shown = ', '.join(map(str, rows[:limit]))
+    return shown if len(rows) <= limit else f"{shown} and {len(rows) - limit} more"
+
+
+def read_batch(source, chunksize=CHUNK_ROWS):
+    """Read and validate a CSV batch chunk by chunk; return the typed rows."""
+    chunks = []
+    first_row = 0
+    for chunk in pd.read_csv(source, dtype=str, chunksize=chunksize):
+        chunks.append(validate_chunk(chunk, first_row))
+        first_row += len(chunk)
+    if not chunks:
+        raise ValueError("the batch has no rows")
+    return _concat(chunks)
+
+
+def _concat(frames):
+    """Concatenate typed frames, keeping categoricals on sorted, unioned categories."""
+    frames = [frame for frame in frames if len(frame)] or frames[:1]
+    categories = {
+        col: sorted(set().union(*(frame[col].cat.categories for frame in frames)))
+        for col in CATEGORICAL_COLUMNS
+    }
+    aligned = [
+        frame.assign(**{col: frame[col].cat.set_categories(categories[col]) for col in CATEGORICAL_COLUMNS})
+        for frame in frames
+    ]
+    return pd.concat(aligned, ignore_index=True)
+
+
+def _write_part(batch, batch_dir):
+    """Persist a validated batch as the next Parquet part and return its id."""
+    batch_dir = Path(batch_dir)
+    batch_dir.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256(pd.util.hash_pandas_object(batch, index=False).to_numpy().tobytes()).hexdigest()[:12]
+    batch_id = f"{len(list(batch_dir.glob('*.parquet'))):05d}-{digest}"
+    path = batch_dir / f"{batch_id}.parquet"
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    batch.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    return batch_id
+
+
+class CaseStore:
+    """The dataset as one growing frame, with per-view versions and cubes.
+
+    The frame, index and batch list are replaced, never mutated, on append,
+    so a session holding an older frame keeps a consistent snapshot.
+    """
+
+    def __init__(self, path=DATA_PATH, batch_dir=BATCH_DIR, cache=None, engine=QUERY_ENGINE):
+        self.base_version = dataset_version(path)
+        self.batch_dir = Path(batch_dir)
+        self.cache = shared_cache() if cache is None else cache
+        with span('load', 'dataset'):
+            self.frame, self.index = self.cache.get_or_compute(
+                ('frame', self.base_version), lambda: self._load(path)
+            )
+        # Cubes come from pandas over the frame, or from Arrow over the Parquet files with engine='arrow'
+        self.engine = (
+            ArrowEngine.for_frame(self.frame, snapshot_path(path), self.batch_dir) if engine == 'arrow' else None
+        )
+        # (batch id, first row, end row) per ingested batch, in append order
+        self.batches = []
+        self._dir_stamp = None
+        self._views = {}
+        self._cubes = {}
+        self._lock = threading.RLock()
+        self.refresh()
+
+    @staticmethod
+    def _load(path):
+        frame = load_dataset(path)
+        return frame, BitmapIndex.from_frame(frame)
+
+    @property
+    def data_version(self):
+        """Version of the whole dataset: the base file plus every ingested batch."""
+        return self.view_version(())
+
+    def refresh(self):
+        """Load Parquet parts written since the last look, e.g. by another process."""
+        try:
+            stamp = self.batch_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            return 0
+        with self._lock:
+            if stamp == self._dir_stamp:
+                return 0
+            known = {batch_id for batch_id, _, _ in self.batches}
+            parts = [path for path in sorted(self.batch_dir.glob('*.parquet')) if path.stem not in known]
+            if parts:
+                with span('load', 'batches'):
+                    for path in parts:
+                        self._append(pd.read_parquet(path), path.stem)
+            self._dir_stamp = stamp
+            return len(parts)
+
+    def ingest(self, source, chunksize=CHUNK_ROWS):
+        """Validate a CSV batch, persist it and append it; return the number of rows."""
+        with span('ingest', 'batch'):
+            batch = read_batch(source, chunksize)
+            with self._lock:
+                self.refresh()
+                batch_id = _write_part(batch, self.batch_dir)
+                self._append(batch, batch_id)
+                self._dir_stamp = self.batch_dir.stat().st_mtime_ns
+        return len(batch)
+
+    def _append(self, batch, batch_id):
+        start = len(self.frame)
+        self.frame = _concat([self.frame, batch.astype(COLUMN_DTYPES)])
+        self.index = self.index.extend(batch)
+        self.batches = [*self.batches, (batch_id, start, len(self.frame))]
+
+    def _rows(self, filter_key):
+        return self.index.select(dict(filter_key))
+
+    def _touched(self, rows):
+        """Batches contributing at least one row to a view with these row positions."""
+        if rows is None:
+            return tuple(self.batches)
+        return tuple(
+            batch for batch in self.batches
+            if np.searchsorted(rows, batch[1]) < np.searchsorted(rows, batch[2])
+        )
+
+    def view_version(self, filter_key):
+        """Cache version of a (possibly filtered) view, changed only by batches it contains."""
+        with self._lock:
+            touched = self._touched(self._rows(filter_key))
+        version = self.base_version
+        if touched:
+            batch_ids = ','.join(batch_id for batch_id, _, _ in touched)
+            version = f"{version}+{hashlib.sha256(batch_ids.encode()).hexdigest()[:8]}"
+        return filtered_version(version, filter_key)
+
+    def view(self, filter_key):
+        """Rows matching ``filter_key``; cached per selection and view version."""
+        with self._lock:
+            version = self.view_version(filter_key)
+            cached = self._views.get(filter_key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            rows = self._rows(filter_key)
+            view = self.frame if rows is None else self.frame.iloc[rows]
+            self._views.pop(filter_key, None)
+            self._views[filter_key] = (version, view)
+            while len(self._views) > MAX_CACHED_VIEWS:
+                self._views.pop(next(iter(self._views)))
+            return view
+
+    def cube(self, filter_key):
+        """Aggregate cube of a view, updated by merging the cube of its new rows only."""
+        with self._lock, span('aggregate', 'cube') as current:
+            rows = self._rows(filter_key)
+            touched = self._touched(rows)
+            cached = self._cubes.get(filter_key)
+            current.cache = 'hit' if cached is not None and cached[0] == touched else 'miss'
+            if cached is None:
+                cube = self.cache.get_or_compute(
+                    ('cube', self.view_version(filter_key)), lambda: self._cube(filter_key, rows)
+                )
+            elif cached[0] == touched:
+                return cached[1]
+            else:
+                added = [batch for batch in touched if batch not in cached[0]]
+                current.name = 'cube merge'
+                cube = cached[1].merge(self._cube(filter_key, rows, added))
+            self._cubes.pop(filter_key, None)
+            self._cubes[filter_key] = (touched, cube)
+            while len(self._cubes) > MAX_CACHED_VIEWS:
+                self._cubes.pop(next(iter(self._cubes)))
+            return cube
+
+    def _cube(self, filter_key, rows, batches=None):
+        """Cube of the view's rows, or of only its rows in ``batches``."""
+        if self.engine is not None:
+            categories = {col: self.frame[col].cat.categories for col in CATEGORICAL_COLUMNS}
+            # Only the files this store has loaded, even if more parts have appeared since
+            batch_ids = [''] if batches is None else []
+            batch_ids += [batch_id for batch_id, _, _ in (self.batches if batches is None else batches)]
+            return self.engine.cube(filter_key, categories, batch_ids)
+        if batches is not None:
+            rows = self._batch_rows(rows, batches)
+        return AggregateCube.from_frame(self.frame if rows is None else self.frame.iloc[rows])
+
+    @staticmethod
+    def _batch_rows(rows, batches):
+        """Positions of the view's rows that fall inside ``batches``."""
+        if rows is None:
+            return np.concatenate([np.arange(start, stop) for _, start, stop in batches])
+        return np.concatenate([
+            rows[np.searchsorted(rows, start):np.searchsorted(rows, stop)] for _, start, stop in batches
+        ])
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit("usage: python store.py BATCH.csv [BATCH.csv ...]")
+    store = CaseStore()
+    for source in sys.argv[1:]:
+        try:
+            print(f"{source}: {store.ingest(source)} rows appended")
+        except ValueError as exc:
+            sys.exit(f"{source}: rejected ({exc})")
+    print(f"dataset version {store.data_version}, {len(store.frame)} rows")
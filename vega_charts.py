@@ -0,0 +1,145 @@
+"""Interactive Vega-Lite versions of the Visualizations charts.
+
+The charts are built with Altair from the same ``ChartSpec`` registry and
+``chart_table`` aggregates as the matplotlib charts. Only the small
+aggregated table is sent to the browser. The browser then draws the chart and
+handles tooltips, legend highlighting, resizing and theme changes itself,
+with no server render.
+
+Colours come from the spec's seaborn palette or matplotlib colormap, so both
+backends colour a chart the same way.
+"""
+import altair as alt
+import pandas as pd
+import seaborn as sns
+
+from charts import chart_table
+from instrumentation import span
+
+# Pixels per inch of the matplotlib figure height
+HEIGHT_PER_INCH = 60
+
+
+def _colors(palette, n):
+    return sns.color_palette(palette, n).as_hex()
+
+
+def _series_frame(table):
+    return table.rename_axis('x').reset_index(name='y')
+
+
+def _bar(spec, table):
+    data = _series_frame(table)
+    order = data['x'].tolist()
+    return alt.Chart(data).mark_bar(stroke='black', strokeWidth=0.5).encode(
+        x=alt.X('x:N', sort=order, title=spec.xlabel),
+        y=alt.Y('y:Q', title=spec.ylabel),
+        color=alt.Color('x:N', scale=alt.Scale(domain=order, range=_colors(spec.palette, len(order))), legend=None),
+        tooltip=[alt.Tooltip('x:N', title=spec.xlabel), alt.Tooltip('y:Q', title=spec.ylabel, format='.2f')],
+    )
+
+
+def _hist(spec, table):
+    return alt.Chart(_series_frame(table)).mark_bar(color=spec.palette, stroke='black', strokeWidth=0.5).encode(
+        x=alt.X('x:Q', bin=alt.Bin(maxbins=spec.options.get('bins', 20)), title=spec.xlabel),
+        y=alt.Y('sum(y):Q', title=spec.ylabel),
+        tooltip=[alt.Tooltip('sum(y):Q', title=spec.ylabel)],
+    )
+
+
+def _line(spec, table):
+    data = table.rename_axis('x').reset_index()
+    order = data['x'].tolist()
+    base = alt.Chart(data).encode(x=alt.X('x:N', sort=order, title=spec.xlabel))
+    band = base.mark_area(opacity=0.2, color=spec.palette).encode(y='low:Q', y2='high:Q')
+    line = base.mark_line(point=True, color=spec.palette, strokeWidth=3).encode(
+        y=alt.Y('mean:Q', title=spec.ylabel, scale=alt.Scale(zero=False)),
+        tooltip=[
+            alt.Tooltip('x:N', title=spec.xlabel),
+            alt.Tooltip('mean:Q', format='.2f'),
+            alt.Tooltip('low:Q', title='95% CI low', format='.2f'),
+            alt.Tooltip('high:Q', title='95% CI high', format='.2f'),
+        ],
+    )
+    return band + line
+
+
+def _box(spec, table):
+    stats = pd.DataFrame(
+        [{key: row[key] for key in ('label', 'whislo', 'q1', 'med', 'q3', 'whishi')} for row in table]
+    )
+    fliers = pd.DataFrame(
+        [{'label': row['label'], 'value': value} for row in table for value in row['fliers']],
+        columns=['label', 'value']
+    )
+    horizontal = not spec.options.get('vert', True)
+    order = stats['label'].tolist()
+    label_axis = alt.Y if horizontal else alt.X
+    value_axis, value_end = (alt.X, alt.X2) if horizontal else (alt.Y, alt.Y2)
+    label = label_axis('label:N', sort=order, title=None if horizontal else spec.xlabel,
+                       axis=None if not spec.dimensions else alt.Axis())
+    value_title = spec.xlabel if horizontal else spec.ylabel
+    base = alt.Chart(stats).encode(label)
+    whiskers = base.mark_rule().encode(value_axis('whislo:Q', title=value_title, scale=alt.Scale(zero=False)),
+                                       value_end('whishi:Q'))
+    boxes = base.mark_bar(size=24, color=spec.palette, stroke='black').encode(
+        value_axis('q1:Q'), value_end('q3:Q'),
+        tooltip=['label:N', 'whislo:Q', 'q1:Q', 'med:Q', 'q3:Q', 'whishi:Q'],
+    )
+    medians = base.mark_tick(color='black', size=24, thickness=2).encode(value_axis('med:Q'))
+    points = alt.Chart(fliers).mark_point(color='black').encode(
+        label_axis('label:N', sort=order), value_axis('value:Q'), tooltip=['label:N', 'value:Q']
+    )
+    return whiskers + boxes + medians + points
+
+
+def _pie(spec, table):
+    data = _series_frame(table)
+    order = data['x'].tolist()
+    return alt.Chart(data).transform_joinaggregate(total='sum(y)').transform_calculate(
+        share='datum.y / datum.total'
+    ).mark_arc(stroke='white', strokeWidth=3).encode(
+        theta=alt.Theta('y:Q', stack=True),
+        order=alt.Order('y:Q', sort='descending'),
+        color=alt.Color('x:N', sort=order, title=None,
+                        scale=alt.Scale(domain=order, range=_colors(spec.palette, len(order)))),
+        tooltip=[alt.Tooltip('x:N', title='Type'), alt.Tooltip('y:Q', title='Cases'),
+                 alt.Tooltip('share:Q', title='Share', format='.1%')],
+    )
+
+
+def _crosstab(spec, table):
+    data = table.rename_axis(index='x', columns='series').stack().rename('y').reset_index()
+    order = table.index.tolist()
+    series = table.columns.tolist()
+    highlight = alt.selection_point(fields=['series'], bind='legend')
+    encoding = dict(
+        x=alt.X('x:N', sort=order, title=spec.xlabel),
+        y=alt.Y('y:Q', title=spec.ylabel, stack='zero' if spec.kind == 'stacked_bar' else None),
+        color=alt.Color('series:N', title=spec.legend_title,
+                        scale=alt.Scale(domain=series, range=_colors(spec.palette, len(series)))),
+        opacity=alt.condition(highlight, alt.value(1.0), alt.value(0.2)),
+        tooltip=[alt.Tooltip('x:N', title=spec.xlabel), alt.Tooltip('series:N', title=spec.legend_title),
+                 alt.Tooltip('y:Q', title=spec.ylabel)],
+    )
+    if spec.kind == 'grouped_bar':
+        encoding['xOffset'] = alt.XOffset('series:N', sort=series)
+    return alt.Chart(data).mark_bar(stroke='black', strokeWidth=0.3).encode(**encoding).add_params(highlight)
+
+
+BUILDERS = {
+    'bar': _bar,
+    'hist': _hist,
+    'line': _line,
+    'box': _box,
+    'pie': _pie,
+    'stacked_bar': _crosstab,
+    'grouped_bar': _crosstab,
+}
+
+
+def vega_chart(spec, cube):
+    """Altair chart for ``spec``, carrying only its aggregated table."""
+    with span('render', f"{spec.name} (vega)"):
+        chart = BUILDERS[spec.kind](spec, chart_table(spec, cube))
+        return chart.properties(title=spec.title, height=spec.figsize[1] * HEIGHT_PER_INCH)
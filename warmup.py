@@ -0,0 +1,103 @@
+"""Background pre-rendering so chart switches are served from ready images.
+
+A ``WarmUp`` runs a plan in a coordinator thread. The plan loads what it
+needs and then submits jobs to a small thread pool. The threads only do the
+cache I/O: a job looks its result up and, on a miss, hands the CPU-bound
+work (drawing a chart, fitting the clusters) to ``compute``, which runs it in
+a joblib loky process pool and waits. The threads hold no GIL while they
+wait, so the warm-up does not slow down the sessions the server is serving.
+The counters let the page show how far the pool has got.
+
+loky starts clean interpreters that import only what the job needs. Unlike
+a ``multiprocessing`` spawn pool, it does not re-run Streamlit's
+``__main__`` script in the workers. Jobs are pickled with cloudpickle, so
+closures work. The workers also run at a lower scheduling priority
+(``WORKER_NICENESS``), so on a host with few cores the operating system
+still gives the server process the CPU first. The process pool is started on
+the first ``compute`` and shut down once the warm-up finishes.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+WORKER_NICENESS = 10
+
+
+def _lower_priority(increment):
+    # os.nice is POSIX only; elsewhere the workers keep the server's priority
+    if hasattr(os, 'nice'):
+        os.nice(increment)
+
+
+class WarmUp:
+    """Progress of one background warm-up: a plan thread feeding a thread pool backed by worker processes."""
+
+    def __init__(self, max_workers=DEFAULT_WORKERS):
+        self.stage = "Starting"
+        self.submitted = 0
+        self.completed = 0
+        self.errors = []
+        self.planned = False
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='warmup')
+        self._processes = None
+        self._lock = threading.Lock()
+
+    def start(self, plan, *args):
+        """Run ``plan(self, *args)`` in the background; the plan queues jobs with ``submit``."""
+        threading.Thread(target=self._plan, args=(plan, *args), name='warmup-plan', daemon=True).start()
+        return self
+
+    def _plan(self, plan, *args):
+        try:
+            plan(self, *args)
+        except Exception as exc:
+            self.errors.append(f"plan: {exc!r}")
+        finally:
+            with self._lock:
+                self.planned = True
+            self._shutdown_if_finished()
+
+    def submit(self, name, fn, *args):
+        """Queue ``fn(*args)`` on the thread pool."""
+        with self._lock:
+            self.submitted += 1
+        return self._executor.submit(self._run, name, fn, *args)
+
+    def compute(self, fn, *args, **kwargs):
+        """Run ``fn(*args, **kwargs)`` in a worker process and return its result; called from jobs."""
+        from joblib.externals.loky import ProcessPoolExecutor
+
+        with self._lock:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(
+                    self.max_workers, initializer=_lower_priority, initargs=(WORKER_NICENESS,)
+                )
+        return self._processes.submit(fn, *args, **kwargs).result()
+
+    def _run(self, name, fn, *args):
+        try:
+            fn(*args)
+        except Exception as exc:
+            with self._lock:
+                self.errors.append(f"{name}: {exc!r}")
+        finally:
+            with self._lock:
+                self.completed += 1
+            self._shutdown_if_finished()
+
+    def _shutdown_if_finished(self):
+        # Nothing is submitted once the plan is done and every job has completed
+        if self.finished:
+            self._executor.shutdown(wait=False)
+            if self._processes is not None:
+                self._processes.shutdown(wait=False)
+
+    @property
+    def finished(self):
+        return self.planned and self.completed == self.submitted
+
+    @property
+    def progress(self):
+        return self.completed / self.submitted if self.submitted else 0.0